@@ -219,7 +219,8 @@ export const chatWithKnowledge = async (
       query,
       n_results,
       session_id,
-      score_threshold: 0.4  // 降低阈值以匹配更多结果
+      score_threshold: 0.4,  // 降低阈值以匹配更多结果
+      references_layout: 'columns'  // 引用按列返回，减小响应体积
     })
   })
 
@@ -235,7 +236,29 @@ export const chatWithKnowledge = async (
   console.log('[API] Success result:', result)
 
   // 返回结果,session_id 已由后端返回
-  return result
+  return {
+    answer: result.answer,
+    references: result.references ?? zipReferences(result),
+    query: result.query,
+    session_id: result.session_id
+  }
+}
+
+/**
+ * 将列式引用（references_columns + references_rows）还原为逐条引用对象
+ */
+const zipReferences = (result: {
+  references_columns?: string[]
+  references_rows?: any[][]
+  scores?: number[]
+  chunk_texts?: string[]
+}): any[] => {
+  const columns = result.references_columns || []
+  return (result.references_rows || []).map((row, i) => ({
+    chunk_text: result.chunk_texts?.[i] ?? '',
+    score: result.scores?.[i] ?? 0,
+    metadata: Object.fromEntries(columns.map((key, j) => [key, row[j]]))
+  }))
 }
 
 /**
@@ -1,39 +1,49 @@
 import { PrismaClient } from '@prisma/client';
+import { config } from '../utils/config.js';
 
-export const prisma = new PrismaClient();
+// 连接串统一来自 config.postgresUrl（DATABASE_URL，或由 POSTGRES_* 拼出），与其他配置同一来源
+export const prisma = new PrismaClient({
+  datasources: { db: { url: config.postgresUrl } },
+});
 
 export async function initDb() {
   // Test connection
   await prisma.$connect();
   console.log('✅ Database connected');
 
-  // Seed default data if not exists
-  const configCount = await prisma.systemConfig.count();
-  if (configCount === 0) {
-    await prisma.systemConfig.createMany({
+  // 普通默认配置用 skipDuplicates 幂等写入（INSERT ... ON CONFLICT DO NOTHING），缺少的键在启动时补齐
+  // admin_password 和 allow_registration 与安全相关，只在表为空（首次启动）时写入，
+  // 管理员删除后不会在重启时被恢复成默认密码 / 重新开放注册
+  const [adminExists, configCount, settingCount] = await Promise.all([
+    prisma.user.findUnique({ where: { username: 'admin' }, select: { id: true } }),
+    prisma.systemConfig.count(),
+    prisma.systemSetting.count(),
+  ]);
+
+  const [seededConfig] = await Promise.all([
+    // Seed default data if not exists
+    prisma.systemConfig.createMany({
       data: [
         { configKey: 'system_prompt', configValue: '你是一个专业的视频内容助手，能够根据视频转写内容回答用户的问题。请基于提供的上下文准确、详细地回答问题。' },
         { configKey: 'site_title', configValue: 'HearSight - AI 视频智能分析' },
-        { configKey: 'admin_password', configValue: 'admin123' },
+        ...(configCount === 0 ? [{ configKey: 'admin_password', configValue: 'admin123' }] : []),
       ],
       skipDuplicates: true,
-    });
+    }),
+    // Seed default settings
+    settingCount === 0
+      ? prisma.systemSetting.create({ data: { key: 'allow_registration', value: 'true' } })
+      : null,
+  ]);
+
+  if (seededConfig.count > 0) {
     console.log('✅ Default config seeded');
   }
-
-  // Seed default settings
-  const settingCount = await prisma.systemSetting.count();
   if (settingCount === 0) {
-    await prisma.systemSetting.create({
-      data: { key: 'allow_registration', value: 'true' },
-    });
     console.log('✅ Default settings seeded');
   }
 
   // Seed admin user if not exists
-  const adminExists = await prisma.user.findUnique({
-    where: { username: 'admin' },
-  });
   if (!adminExists) {
     const bcrypt = await import('bcrypt');
     const passwordHash = await bcrypt.hash('admin123', 10);
@@ -8,6 +8,7 @@ import { fileURLToPath } from 'url';
 import { config } from './utils/config.js';
 import { initDb, closeDb } from './db/index.js';
 import { getQdrantClient } from './services/qdrant.js';
+import { getEmbeddingService } from './services/embedding.js';
 import { qdrantRoutes } from './routes/qdrant.js';
 import { transcriptRoutes } from './routes/transcripts.js';
 import { authRoutes } from './routes/auth.js';
@@ -19,21 +20,42 @@ const __filename = fileURLToPath(import.meta.url);
 const __dirname = path.dirname(__filename);
 
 async function main() {
-  console.log('');
-  console.log('╔══════════════════════════════════════════════════════════╗');
-  console.log('║         HearSight Server (Node.js Edition)               ║');
-  console.log('║              AI Video RAG Service                        ║');
-  console.log('╚══════════════════════════════════════════════════════════╝');
-  console.log('');
-
-  // Initialize database
+  // 横幅整块一次写出，避免多次写 stdout 时与其他输出交错
+  console.log([
+    '',
+    '╔══════════════════════════════════════════════════════════╗',
+    '║         HearSight Server (Node.js Edition)               ║',
+    '║              AI Video RAG Service                        ║',
+    '╚══════════════════════════════════════════════════════════╝',
+    '',
+  ].join('\n'));
+
+  // Initialize database, check Qdrant connection and warm up services concurrently
+  // 启动耗时取决于最慢的一项，而不是各项之和；数据库初始化失败仍然终止启动
+  // (视频列表预取填充缓存)
   console.log('📦 Initializing database...');
-  await initDb();
-
-  // Check Qdrant connection
   console.log('🔍 Checking Qdrant connection...');
   const qdrantClient = getQdrantClient();
-  const qdrantHealthy = await qdrantClient.checkConnection();
+  const embeddingService = getEmbeddingService();
+
+  // embedding 预热建立 TLS 连接；外部 API 可能很慢，后台执行，不阻塞启动
+  embeddingService.embed('warmup').catch((error) => {
+    console.warn('⚠️ Embedding warmup failed:', error);
+  });
+
+  const [, qdrantHealthy] = await Promise.all([
+    initDb(),
+    qdrantClient.checkConnection(),
+    qdrantClient.listAllVideos().catch(() => []),
+  ]);
+  if (qdrantHealthy) {
+    if (config.qdrantEnsureIndexes) {
+      await qdrantClient.ensurePayloadIndexes();
+    }
+    if (config.qdrantQuantization !== 'none') {
+      await qdrantClient.ensureQuantization(config.qdrantQuantization);
+    }
+  }
 
   // Create Fastify instance
   const fastify = Fastify({
@@ -135,7 +157,7 @@ async function main() {
   fastify.get('/api', async () => {
     return {
       version: '1.0.0',
-      rag_enabled: process.env.RAG_ENABLED !== 'false',
+      rag_enabled: config.ragEnabled,
       qdrant_status: qdrantHealthy ? 'healthy' : 'unavailable',
     };
   });
@@ -175,6 +197,14 @@ async function main() {
       }
     }
 
+    // Qdrant unreachable
+    if (error.name === 'QdrantUnavailableError') {
+      return reply.status(503).send({
+        detail: 'Cannot connect to Qdrant',
+        code: 'QDRANT_UNAVAILABLE',
+      });
+    }
+
     // JWT error
     if (error.name === 'JsonWebTokenError') {
       return reply.status(401).send({
@@ -232,19 +262,21 @@ async function main() {
       host: '0.0.0.0',
     });
 
-    console.log('');
-    console.log('╔══════════════════════════════════════════════════════════╗');
-    console.log('║                    Server Started                        ║');
-    console.log('╠══════════════════════════════════════════════════════════╣');
-    console.log(`║  🌐 URL:      http://localhost:${config.port.toString().padEnd(24)}║`);
-    console.log(`║  📊 Qdrant:   ${config.qdrantUrl.padEnd(36)}║`);
-    console.log(`║  🗄️  Database: PostgreSQL                                 ║`);
-    console.log(`║  🔐 OSS:      ${(config.ossEnabled ? 'Enabled' : 'Disabled').padEnd(36)}║`);
-    console.log(`║  🤖 RAG:      ${(process.env.RAG_ENABLED !== 'false' ? 'Enabled' : 'Disabled').padEnd(36)}║`);
-    console.log('╚══════════════════════════════════════════════════════════╝');
-    console.log('');
-    console.log('📝 Default admin account: admin / admin123');
-    console.log('');
+    console.log([
+      '',
+      '╔══════════════════════════════════════════════════════════╗',
+      '║                    Server Started                        ║',
+      '╠══════════════════════════════════════════════════════════╣',
+      `║  🌐 URL:      http://localhost:${config.port.toString().padEnd(24)}║`,
+      `║  📊 Qdrant:   ${config.qdrantUrl.padEnd(36)}║`,
+      `║  🗄️  Database: PostgreSQL                                 ║`,
+      `║  🔐 OSS:      ${(config.ossEnabled ? 'Enabled' : 'Disabled').padEnd(36)}║`,
+      `║  🤖 RAG:      ${(config.ragEnabled ? 'Enabled' : 'Disabled').padEnd(36)}║`,
+      '╚══════════════════════════════════════════════════════════╝',
+      '',
+      '📝 Default admin account: admin / admin123',
+      '',
+    ].join('\n'));
 
   } catch (err) {
     console.error('❌ Failed to start server:', err);
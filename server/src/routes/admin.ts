@@ -1,23 +1,35 @@
 import { FastifyInstance, FastifyRequest, FastifyReply } from 'fastify';
 import { z } from 'zod';
 import { prisma } from '../db/index.js';
-import { requireAdmin, hashPassword } from '../utils/auth.js';
+import { requireAdmin, hashPassword, createToken } from '../utils/auth.js';
+import { config } from '../utils/config.js';
 import { getOssService } from '../services/oss.js';
+import { getQdrantClient } from '../services/qdrant.js';
+import { getLlmService } from '../services/llm.js';
 
 // ==================== 自然排序工具函数 ====================
 
+// 文本块按数字/非数字切分；非数字块用中文排序规则比较（Collator 只创建一次）
+const NATURAL_CHUNK_PATTERN = /(\d+)|(\D+)/g;
+const ZH_COLLATOR = new Intl.Collator('zh-CN');
+
+type NaturalKey = Array<number | string>;
+
 /**
- * 自然排序比较函数 - 支持数字按值大小排序
+ * 预先切分排序键：数字块转为数值，其余转小写保留字符串
  */
-function naturalSort(a: string, b: string): number {
-  if (!a && !b) return 0;
-  if (!a) return -1;
-  if (!b) return 1;
-
-  const regex = /(\d+)|(\D+)/g;
-  const chunksA = a.toLowerCase().match(regex) || [];
-  const chunksB = b.toLowerCase().match(regex) || [];
+function naturalKey(text: string): NaturalKey {
+  const chunks = text.toLowerCase().match(NATURAL_CHUNK_PATTERN) || [];
+  return chunks.map(chunk => {
+    const code = chunk.charCodeAt(0);
+    return code >= 48 && code <= 57 ? parseInt(chunk, 10) : chunk;
+  });
+}
 
+/**
+ * 自然排序比较函数 - 支持数字按值大小排序（空键排在最前）
+ */
+function compareNaturalKeys(chunksA: NaturalKey, chunksB: NaturalKey): number {
   const maxLength = Math.max(chunksA.length, chunksB.length);
 
   for (let i = 0; i < maxLength; i++) {
@@ -27,20 +39,17 @@ function naturalSort(a: string, b: string): number {
     if (chunkA === undefined) return -1;
     if (chunkB === undefined) return 1;
 
-    const numA = parseInt(chunkA, 10);
-    const numB = parseInt(chunkB, 10);
-
-    const isNumA = !isNaN(numA);
-    const isNumB = !isNaN(numB);
+    const isNumA = typeof chunkA === 'number';
+    const isNumB = typeof chunkB === 'number';
 
     if (isNumA && isNumB) {
-      if (numA !== numB) return numA - numB;
+      if (chunkA !== chunkB) return chunkA - chunkB;
     } else if (isNumA) {
       return -1;
     } else if (isNumB) {
       return 1;
     } else {
-      const cmp = chunkA.localeCompare(chunkB, 'zh-CN');
+      const cmp = ZH_COLLATOR.compare(chunkA, chunkB);
       if (cmp !== 0) return cmp;
     }
   }
@@ -50,13 +59,30 @@ function naturalSort(a: string, b: string): number {
 
 /**
  * 对视频列表进行自然排序
+ * 每个标题只切分一次，而不是在每次比较时重新切分（O(n) 次而非 O(n log n) 次）
  */
 function sortVideosNaturally<T extends { video_title?: string | null; topic?: string | null }>(videos: T[]): T[] {
-  return [...videos].sort((a, b) => {
-    const titleA = a.video_title || a.topic || '';
-    const titleB = b.video_title || b.topic || '';
-    return naturalSort(titleA, titleB);
-  });
+  return videos
+    .map(video => ({ video, key: naturalKey(video.video_title || video.topic || '') }))
+    .sort((a, b) => compareNaturalKeys(a.key, b.key))
+    .map(entry => entry.video);
+}
+
+// ==================== 配置工具函数 ====================
+
+/**
+ * 获取所有配置（不返回敏感配置）
+ */
+async function getVisibleConfigs(): Promise<Record<string, string>> {
+  const configs = await prisma.systemConfig.findMany();
+
+  const result: Record<string, string> = {};
+  for (const c of configs) {
+    if (c.configKey === 'admin_password') continue;
+    result[c.configKey] = c.configValue;
+  }
+
+  return result;
 }
 
 // ==================== 请求验证 Schema ====================
@@ -97,6 +123,8 @@ const settingUpdateSchema = z.object({
 
 export async function adminRoutes(fastify: FastifyInstance) {
   const ossService = getOssService();
+  const qdrantClient = getQdrantClient();
+  const llmService = getLlmService();
 
   // ==================== 系统统计 ====================
 
@@ -106,41 +134,43 @@ export async function adminRoutes(fastify: FastifyInstance) {
   fastify.get('/api/admin-panel/stats', {
     preHandler: requireAdmin,
   }, async () => {
-    // 获取 Qdrant 视频数量
-    let totalQdrantVideos = 0;
-    try {
-      const { getQdrantClient } = await import('../services/qdrant.js');
-      const qdrantClient = getQdrantClient();
-      if (await qdrantClient.checkConnection()) {
-        const videos = await qdrantClient.listAllVideos();
-        totalQdrantVideos = videos.length;
+    // 获取 Qdrant 视频数量（与数据库统计并发执行）
+    const countQdrantVideos = async (): Promise<number> => {
+      try {
+        if (await qdrantClient.checkConnection()) {
+          const videos = await qdrantClient.listAllVideos();
+          return videos.length;
+        }
+      } catch (error) {
+        console.warn('Failed to get Qdrant video count:', error);
       }
-    } catch (error) {
-      console.warn('Failed to get Qdrant video count:', error);
-    }
+      return 0;
+    };
 
     const [
+      totalQdrantVideos,
       totalUsers,
       activeUsers,
       adminUsers,
       totalVideos,
-      totalJobs,
-      pendingJobs,
-      runningJobs,
-      successJobs,
-      failedJobs,
+      jobStatusCounts,
     ] = await Promise.all([
+      countQdrantVideos(),
       prisma.user.count(),
       prisma.user.count({ where: { isActive: true } }),
       prisma.user.count({ where: { isAdmin: true } }),
       prisma.transcript.count(),
-      prisma.job.count(),
-      prisma.job.count({ where: { status: 'pending' } }),
-      prisma.job.count({ where: { status: 'running' } }),
-      prisma.job.count({ where: { status: 'success' } }),
-      prisma.job.count({ where: { status: 'failed' } }),
+      // 一次 GROUP BY 取回各状态的任务数，代替五次 count
+      prisma.job.groupBy({ by: ['status'], _count: { _all: true } }),
     ]);
 
+    const jobCounts: Record<string, number> = {};
+    let totalJobs = 0;
+    for (const row of jobStatusCounts) {
+      jobCounts[row.status] = row._count._all;
+      totalJobs += row._count._all;
+    }
+
     return {
       total_users: totalUsers,
       active_users: activeUsers,
@@ -148,10 +178,10 @@ export async function adminRoutes(fastify: FastifyInstance) {
       total_videos: totalVideos,
       total_qdrant_videos: totalQdrantVideos,
       total_jobs: totalJobs,
-      pending_jobs: pendingJobs,
-      running_jobs: runningJobs,
-      success_jobs: successJobs,
-      failed_jobs: failedJobs,
+      pending_jobs: jobCounts.pending || 0,
+      running_jobs: jobCounts.running || 0,
+      success_jobs: jobCounts.success || 0,
+      failed_jobs: jobCounts.failed || 0,
     };
   });
 
@@ -531,9 +561,6 @@ export async function adminRoutes(fastify: FastifyInstance) {
     const search = query.search?.toLowerCase();
 
     try {
-      const { getQdrantClient } = await import('../services/qdrant.js');
-      const qdrantClient = getQdrantClient();
-
       if (!await qdrantClient.checkConnection()) {
         return reply.status(503).send({ detail: 'Qdrant 连接不可用' });
       }
@@ -703,9 +730,6 @@ export async function adminRoutes(fastify: FastifyInstance) {
     const { video_id } = request.params as { video_id: string };
 
     try {
-      const { getQdrantClient } = await import('../services/qdrant.js');
-      const qdrantClient = getQdrantClient();
-
       if (!await qdrantClient.checkConnection()) {
         return reply.status(503).send({ detail: 'Qdrant 连接不可用' });
       }
@@ -732,10 +756,12 @@ export async function adminRoutes(fastify: FastifyInstance) {
         deletedItems.push('点击统计');
       }
 
-      // 删除点击详情
-      await prisma.videoView.deleteMany({
+      // 删除点击详情：行数可能很多且不在响应中返回，后台执行，不阻塞响应
+      prisma.videoView.deleteMany({
         where: { videoId: video_id },
-      }).catch(() => null);
+      }).catch((error) => {
+        console.error('Failed to delete video views:', error);
+      });
 
       return {
         success: true,
@@ -763,9 +789,6 @@ export async function adminRoutes(fastify: FastifyInstance) {
     const body = request.body as { folder_id: string | null };
 
     try {
-      const { getQdrantClient } = await import('../services/qdrant.js');
-      const qdrantClient = getQdrantClient();
-
       if (!await qdrantClient.checkConnection()) {
         return reply.status(503).send({ detail: 'Qdrant 连接不可用' });
       }
@@ -922,36 +945,35 @@ export async function adminRoutes(fastify: FastifyInstance) {
     const { id } = request.params as { id: string };
     const jobId = parseInt(id, 10);
 
-    const job = await prisma.job.findUnique({
-      where: { id: jobId },
+    // 只能重试失败的任务：条件更新一次完成检查和重置，不再先查询再更新
+    const { count } = await prisma.job.updateMany({
+      where: { id: jobId, status: 'failed' },
+      data: {
+        status: 'pending',
+        startedAt: null,
+        finishedAt: null,
+        error: null,
+      },
     });
 
-    if (!job) {
-      return reply.status(404).send({
-        detail: '任务不存在',
-        code: 'JOB_NOT_FOUND',
+    if (count === 0) {
+      // 未更新时再区分任务不存在还是状态不对
+      const job = await prisma.job.findUnique({
+        where: { id: jobId },
+        select: { id: true },
       });
-    }
-
-    // 只能重试失败的任务
-    if (job.status !== 'failed') {
+      if (!job) {
+        return reply.status(404).send({
+          detail: '任务不存在',
+          code: 'JOB_NOT_FOUND',
+        });
+      }
       return reply.status(400).send({
         detail: '只能重试失败的任务',
         code: 'INVALID_JOB_STATUS',
       });
     }
 
-    // 重置任务状态
-    await prisma.job.update({
-      where: { id: jobId },
-      data: {
-        status: 'pending',
-        startedAt: null,
-        finishedAt: null,
-        error: null,
-      },
-    });
-
     return {
       success: true,
       message: '任务已重置为待处理状态',
@@ -964,16 +986,7 @@ export async function adminRoutes(fastify: FastifyInstance) {
    * GET /api/admin/config - 获取所有配置
    */
   fastify.get('/api/admin/config', async () => {
-    const configs = await prisma.systemConfig.findMany();
-
-    const result: Record<string, string> = {};
-    for (const c of configs) {
-      // 不返回敏感配置
-      if (c.configKey === 'admin_password') continue;
-      result[c.configKey] = c.configValue;
-    }
-
-    return result;
+    return getVisibleConfigs();
   });
 
   /**
@@ -1116,7 +1129,6 @@ export async function adminRoutes(fastify: FastifyInstance) {
     });
 
     if (!adminUser) {
-      const { hashPassword } = await import('../utils/auth.js');
       const passwordHash = await hashPassword('admin123');
       adminUser = await prisma.user.create({
         data: {
@@ -1129,7 +1141,6 @@ export async function adminRoutes(fastify: FastifyInstance) {
       });
     }
 
-    const { createToken } = await import('../utils/auth.js');
     const token = createToken(adminUser);
 
     return {
@@ -1139,28 +1150,9 @@ export async function adminRoutes(fastify: FastifyInstance) {
   });
 
   /**
-   * GET /api/admin/configs - 获取所有配置（返回 configs 对象）
+   * POST /api/admin/configs、/api/admin-panel/configs - 更新配置（兼容旧前端）
    */
-  fastify.get('/api/admin/configs', {
-    preHandler: requireAdmin,
-  }, async () => {
-    const configs = await prisma.systemConfig.findMany();
-
-    const result: Record<string, string> = {};
-    for (const c of configs) {
-      if (c.configKey === 'admin_password') continue;
-      result[c.configKey] = c.configValue;
-    }
-
-    return { configs: result };
-  });
-
-  /**
-   * POST /api/admin/configs - 更新配置（兼容旧前端）
-   */
-  fastify.post('/api/admin/configs', {
-    preHandler: requireAdmin,
-  }, async (request: FastifyRequest) => {
+  async function upsertConfigHandler(request: FastifyRequest) {
     const body = request.body as { config_key?: string; config_value?: string };
 
     if (!body.config_key || body.config_value === undefined) {
@@ -1177,7 +1169,23 @@ export async function adminRoutes(fastify: FastifyInstance) {
       success: true,
       message: '配置已更新',
     };
-  });
+  }
+
+  /**
+   * GET /api/admin/configs、/api/admin-panel/configs - 获取所有配置（返回 configs 对象）
+   * 两个路径共用同一组 handler
+   */
+  for (const configsPath of ['/api/admin/configs', '/api/admin-panel/configs']) {
+    fastify.get(configsPath, {
+      preHandler: requireAdmin,
+    }, async () => {
+      return { configs: await getVisibleConfigs() };
+    });
+
+    fastify.post(configsPath, {
+      preHandler: requireAdmin,
+    }, upsertConfigHandler);
+  }
 
   // ==================== 思维导图批量管理 (存储在 PostgreSQL) ====================
 
@@ -1191,12 +1199,6 @@ export async function adminRoutes(fastify: FastifyInstance) {
     const overwrite = body.overwrite === true;
 
     try {
-      const { getQdrantClient } = await import('../services/qdrant.js');
-      const { getLlmService } = await import('../services/llm.js');
-
-      const qdrantClient = getQdrantClient();
-      const llmService = getLlmService();
-
       if (!await qdrantClient.checkConnection()) {
         return reply.status(503).send({ detail: 'Qdrant 连接不可用' });
       }
@@ -1223,25 +1225,24 @@ export async function adminRoutes(fastify: FastifyInstance) {
         mindmapPrompt = getDefaultMindmapPromptForAdmin();
       }
 
-      for (const video of videos) {
-        try {
-          // 检查是否已有思维导图 (从 PostgreSQL 查询)
-          if (!overwrite) {
-            const existingMindmap = await prisma.videoMindmap.findUnique({
-              where: { videoId: video.video_id },
-            });
-            if (existingMindmap) {
-              results.skipped++;
-              continue;
-            }
-          }
+      // 已有思维导图的视频 ID，一次查询取回（不再逐个视频查询）
+      const existingIds = new Set<string>();
+      if (!overwrite) {
+        const existing = await prisma.videoMindmap.findMany({
+          where: { videoId: { in: videos.map(v => v.video_id) } },
+          select: { videoId: true },
+        });
+        for (const m of existing) existingIds.add(m.videoId);
+      }
 
+      const generateOne = async (video: typeof videos[number]) => {
+        try {
           // 获取视频内容
           const videoData = await qdrantClient.getVideoParagraphsByVideoId(video.video_id);
           if (!videoData) {
             results.failed++;
             results.errors.push(`Video not found: ${video.video_id}`);
-            continue;
+            return;
           }
 
           // 构建视频内容
@@ -1286,7 +1287,28 @@ export async function adminRoutes(fastify: FastifyInstance) {
           results.failed++;
           results.errors.push(`${video.video_id}: ${error.message}`);
         }
-      }
+      };
+
+      const pending = videos.filter(video => {
+        if (existingIds.has(video.video_id)) {
+          results.skipped++;
+          return false;
+        }
+        return true;
+      });
+
+      // 最多 mindmapConcurrency 个视频同时生成，LLM 服务端可以合并批处理
+      // 每个视频生成完立即保存，不等待其他视频
+      let nextVideo = 0;
+      const worker = async () => {
+        while (nextVideo < pending.length) {
+          await generateOne(pending[nextVideo++]);
+        }
+      };
+
+      await Promise.all(
+        Array.from({ length: Math.min(Math.max(1, config.mindmapConcurrency), pending.length) }, worker)
+      );
 
       return {
         success: true,
@@ -1308,9 +1330,6 @@ export async function adminRoutes(fastify: FastifyInstance) {
     preHandler: requireAdmin,
   }, async (request: FastifyRequest, reply: FastifyReply) => {
     try {
-      const { getQdrantClient } = await import('../services/qdrant.js');
-      const qdrantClient = getQdrantClient();
-
       if (!await qdrantClient.checkConnection()) {
         return reply.status(503).send({ detail: 'Qdrant 连接不可用' });
       }
@@ -1414,49 +1433,7 @@ export async function adminRoutes(fastify: FastifyInstance) {
     };
   });
 
-  // ==================== Admin Panel 配置 API ====================
-
-  /**
-   * GET /api/admin-panel/configs - 获取所有系统配置
-   */
-  fastify.get('/api/admin-panel/configs', {
-    preHandler: requireAdmin,
-  }, async () => {
-    const configs = await prisma.systemConfig.findMany();
-
-    const result: Record<string, string> = {};
-    for (const c of configs) {
-      // 不返回敏感配置
-      if (c.configKey === 'admin_password') continue;
-      result[c.configKey] = c.configValue;
-    }
-
-    return { configs: result };
-  });
-
-  /**
-   * POST /api/admin-panel/configs - 更新系统配置
-   */
-  fastify.post('/api/admin-panel/configs', {
-    preHandler: requireAdmin,
-  }, async (request: FastifyRequest) => {
-    const body = request.body as { config_key?: string; config_value?: string };
-
-    if (!body.config_key || body.config_value === undefined) {
-      return { success: false, message: '缺少配置键或值' };
-    }
-
-    await prisma.systemConfig.upsert({
-      where: { configKey: body.config_key },
-      update: { configValue: body.config_value },
-      create: { configKey: body.config_key, configValue: body.config_value },
-    });
-
-    return {
-      success: true,
-      message: '配置已更新',
-    };
-  });
+  // ==================== Admin Panel 设置 API ====================
 
   /**
    * GET /api/admin-panel/settings - 获取所有系统设置
@@ -24,15 +24,8 @@ export async function knowledgeRoutes(fastify: FastifyInstance) {
   fastify.post('/api/knowledge/search', async (request: FastifyRequest, reply: FastifyReply) => {
     const body = searchSchema.parse(request.body);
 
-    if (!await qdrantClient.checkConnection()) {
-      return reply.status(503).send({
-        detail: 'Qdrant 连接不可用',
-        code: 'QDRANT_UNAVAILABLE',
-      });
-    }
-
     // Generate embedding
-    const queryEmbedding = await embeddingService.embed(body.query);
+    const queryEmbedding = await embeddingService.embedQuery(body.query);
 
     // Search
     const results = await qdrantClient.searchSimilar(
@@ -73,14 +66,7 @@ export async function knowledgeRoutes(fastify: FastifyInstance) {
   /**
    * GET /api/knowledge/videos - 获取知识库视频列表
    */
-  fastify.get('/api/knowledge/videos', async (request: FastifyRequest, reply: FastifyReply) => {
-    if (!await qdrantClient.checkConnection()) {
-      return reply.status(503).send({
-        detail: 'Qdrant 连接不可用',
-        code: 'QDRANT_UNAVAILABLE',
-      });
-    }
-
+  fastify.get('/api/knowledge/videos', async () => {
     const videos = await qdrantClient.listAllVideos();
 
     return {
@@ -110,7 +96,8 @@ export async function knowledgeRoutes(fastify: FastifyInstance) {
 
     const history = await prisma.chatHistory.findMany({
       where: { sessionId },
-      orderBy: { createdAt: 'asc' },
+      // 同一轮对话的两条消息一次写入，createdAt 可能相同，用 id 保证顺序
+      orderBy: [{ createdAt: 'asc' }, { id: 'asc' }],
       take: limit,
     });
 
@@ -1,12 +1,14 @@
 import { FastifyInstance, FastifyRequest, FastifyReply } from 'fastify';
 import { z } from 'zod';
-import { getQdrantClient } from '../services/qdrant.js';
+import { randomUUID } from 'crypto';
+import { getQdrantClient, QdrantUnavailableError } from '../services/qdrant.js';
 import { getEmbeddingService } from '../services/embedding.js';
 import { getLlmService } from '../services/llm.js';
 import { getOssService } from '../services/oss.js';
 import { prisma } from '../db/index.js';
-import { v4 as uuidv4 } from 'uuid';
 import { optionalAuth } from '../utils/auth.js';
+import { config } from '../utils/config.js';
+import type { QdrantSearchResult, QdrantVideo, RagChatResponse } from '../types/index.js';
 
 // 默认思维导图生成提示词
 function getDefaultMindmapPrompt(): string {
@@ -33,6 +35,20 @@ function getDefaultMindmapPrompt(): string {
 请基于视频内容生成思维导图：`;
 }
 
+/**
+ * 获取思维导图提示词配置，读取失败时使用默认提示词
+ */
+async function getMindmapPrompt(): Promise<string> {
+  try {
+    const promptConfig = await prisma.systemConfig.findUnique({
+      where: { configKey: 'mindmap_prompt' },
+    });
+    return promptConfig?.configValue || getDefaultMindmapPrompt();
+  } catch {
+    return getDefaultMindmapPrompt();
+  }
+}
+
 // Request schemas
 const chatRequestSchema = z.object({
   query: z.string().min(1),
@@ -41,6 +57,8 @@ const chatRequestSchema = z.object({
   score_threshold: z.number().default(0.7),
   language_filter: z.string().optional(),
   folder_id: z.string().optional(),
+  // columns: 引用按列返回，避免每条引用重复 metadata 键名
+  references_layout: z.enum(['rows', 'columns']).default('rows'),
 });
 
 const searchRequestSchema = z.object({
@@ -51,6 +69,209 @@ const searchRequestSchema = z.object({
   folder_id: z.string().optional(),
 });
 
+const chatBatchRequestSchema = chatRequestSchema.omit({ query: true }).extend({
+  queries: z.array(z.string().min(1)).min(1).max(20),
+});
+
+const searchBatchRequestSchema = searchRequestSchema.omit({ query: true }).extend({
+  queries: z.array(z.string().min(1)).min(1).max(20),
+});
+
+// Response schemas - 让 Fastify 使用 fast-json-stringify 预编译序列化器
+const nullableString = { type: ['string', 'null'] } as const;
+
+const referenceJsonSchema = {
+  type: 'object',
+  properties: {
+    chunk_text: { type: 'string' },
+    score: { type: 'number' },
+    metadata: {
+      type: 'object',
+      properties: {
+        video_title: { type: 'string' },
+        video_path: nullableString,
+        video_id: nullableString,
+        start_time: { type: 'number' },
+        end_time: { type: 'number' },
+        summary: nullableString,
+        language: { type: 'string' },
+        source_type: { type: 'string' },
+      },
+    },
+  },
+} as const;
+
+const searchItemJsonSchema = {
+  type: 'object',
+  properties: {
+    chunk_id: { type: 'string' },
+    video_title: { type: 'string' },
+    chunk_text: { type: 'string' },
+    summary: nullableString,
+    start_time: { type: 'number' },
+    end_time: { type: 'number' },
+    score: { type: 'number' },
+    language: { type: 'string' },
+    source_type: { type: 'string' },
+  },
+} as const;
+
+const chatAnswerJsonSchema = {
+  type: 'object',
+  properties: {
+    answer: { type: 'string' },
+    references: { type: 'array', items: referenceJsonSchema },
+    references_columns: { type: 'array', items: { type: 'string' } },
+    references_rows: {
+      type: 'array',
+      items: { type: 'array', items: { type: ['string', 'number', 'null'] } },
+    },
+    scores: { type: 'array', items: { type: 'number' } },
+    chunk_texts: { type: 'array', items: { type: 'string' } },
+    query: { type: 'string' },
+  },
+} as const;
+
+const chatResponseSchema = {
+  response: {
+    200: {
+      type: 'object',
+      properties: {
+        ...chatAnswerJsonSchema.properties,
+        session_id: { type: 'string' },
+      },
+    },
+  },
+};
+
+const chatBatchResponseSchema = {
+  response: {
+    200: {
+      type: 'object',
+      properties: {
+        results: { type: 'array', items: chatAnswerJsonSchema },
+        session_id: { type: 'string' },
+      },
+    },
+  },
+};
+
+const searchResponseSchema = {
+  response: {
+    200: {
+      type: 'object',
+      properties: {
+        results: { type: 'array', items: searchItemJsonSchema },
+      },
+    },
+  },
+};
+
+const searchBatchResponseSchema = {
+  response: {
+    200: {
+      type: 'object',
+      properties: {
+        results: { type: 'array', items: { type: 'array', items: searchItemJsonSchema } },
+      },
+    },
+  },
+};
+
+const NO_RESULTS_ANSWER = '抱歉，我在知识库中没有找到相关内容来回答您的问题。';
+
+function toReference(r: QdrantSearchResult): RagChatResponse['references'][number] {
+  return {
+    chunk_text: r.chunk_text,
+    score: r.score,
+    metadata: {
+      video_title: r.video_title,
+      video_path: r.video_path,
+      video_id: r.video_id,
+      start_time: r.start_time,
+      end_time: r.end_time,
+      summary: r.paragraph_summary,
+      language: r.language,
+      source_type: r.source_type,
+    },
+  };
+}
+
+// 列式引用布局的列顺序，前端按此顺序还原 metadata
+const REFERENCE_COLUMNS = [
+  'video_title',
+  'video_path',
+  'video_id',
+  'start_time',
+  'end_time',
+  'summary',
+  'language',
+  'source_type',
+] as const;
+
+type ChatReferences = RagChatResponse['references'];
+
+/**
+ * 按请求的布局输出引用：rows 为逐条对象，columns 为列名 + 值数组
+ */
+function formatReferences(references: ChatReferences, layout: 'rows' | 'columns') {
+  if (layout === 'rows') {
+    return { references };
+  }
+
+  return {
+    references_columns: REFERENCE_COLUMNS,
+    references_rows: references.map(ref => REFERENCE_COLUMNS.map(key => ref.metadata[key])),
+    scores: references.map(ref => ref.score),
+    chunk_texts: references.map(ref => ref.chunk_text),
+  };
+}
+
+function toSearchItem(r: QdrantSearchResult) {
+  return {
+    chunk_id: r.chunk_id,
+    video_title: r.video_title,
+    chunk_text: r.chunk_text,
+    summary: r.paragraph_summary,
+    start_time: r.start_time,
+    end_time: r.end_time,
+    score: r.score,
+    language: r.language,
+    source_type: r.source_type,
+  };
+}
+
+/**
+ * 后台保存一轮对话（用户提问 + 助手回答），失败只记录日志
+ */
+function saveChatPair(
+  sessionId: string,
+  userId: number | null,
+  query: string,
+  answer: string,
+  references: unknown[]
+): void {
+  prisma.chatHistory.createMany({
+    data: [
+      {
+        sessionId,
+        userId,  // 可选用户关联
+        role: 'user',
+        content: query,
+      },
+      {
+        sessionId,
+        userId,
+        role: 'assistant',
+        content: answer,
+        metadata: { references } as any,
+      },
+    ],
+  }).catch((error) => {
+    console.error('Failed to save chat history:', error);
+  });
+}
+
 export async function qdrantRoutes(fastify: FastifyInstance) {
   const qdrantClient = getQdrantClient();
   const embeddingService = getEmbeddingService();
@@ -62,33 +283,29 @@ export async function qdrantRoutes(fastify: FastifyInstance) {
     const isHealthy = await qdrantClient.checkConnection();
     return {
       status: isHealthy ? 'healthy' : 'unhealthy',
-      qdrant_url: process.env.QDRANT_URL || 'http://localhost:6333',
-      rag_enabled: process.env.RAG_ENABLED !== 'false',
+      qdrant_url: config.qdrantUrl,
+      rag_enabled: config.ragEnabled,
     };
   });
 
   // RAG Chat
   fastify.post('/api/qdrant/chat', {
     preHandler: optionalAuth,  // 可选认证，不强制登录
+    schema: chatResponseSchema,
   }, async (request: FastifyRequest, reply: FastifyReply) => {
     const body = chatRequestSchema.parse(request.body);
-    const sessionId = body.session_id || uuidv4();
+    const sessionId = body.session_id || randomUUID();
 
     // 获取可选的用户 ID
     const userId = request.user ? parseInt(request.user.sub, 10) : null;
 
     // Check RAG enabled
-    if (process.env.RAG_ENABLED === 'false') {
+    if (!config.ragEnabled) {
       return reply.status(503).send({ detail: 'Qdrant RAG is disabled' });
     }
 
-    // Check Qdrant connection
-    if (!await qdrantClient.checkConnection()) {
-      return reply.status(503).send({ detail: 'Cannot connect to Qdrant' });
-    }
-
-    // Generate query embedding
-    const queryEmbedding = await embeddingService.embed(body.query);
+    // Generate query embedding (Qdrant 不可用时由检索调用抛出 503)
+    const queryEmbedding = await embeddingService.embedQuery(body.query);
 
     // Search Qdrant
     const results = await qdrantClient.searchSimilar(
@@ -97,111 +314,120 @@ export async function qdrantRoutes(fastify: FastifyInstance) {
       body.score_threshold,
       {
         language: body.language_filter,
+        folder_id: body.folder_id,
       }
     );
 
     let answer: string;
-    let references: Array<{
-      chunk_text: string;
-      score: number;
-      metadata: {
-        video_title: string;
-        video_path: string | null;
-        video_id: string | null;
-        start_time: number;
-        end_time: number;
-        summary: string | null;
-        language: string;
-        source_type: string;
-      };
-    }> = [];
+    let references: ChatReferences = [];
 
     if (results.length === 0) {
-      answer = '抱歉，我在知识库中没有找到相关内容来回答您的问题。';
+      answer = NO_RESULTS_ANSWER;
     } else {
-      // Format RAG context and generate answer
-      const ragContext = llmService.formatRagContext(results);
+      // Trim to the LLM context budget, then format RAG context and generate answer
+      const contextResults = llmService.fitContextBudget(results, config.ragIncludeSummaries);
+      const ragContext = llmService.formatRagContext(contextResults, config.ragIncludeSummaries);
       answer = await llmService.chat(body.query, ragContext);
-
-      // Format references
-      references = results.map(r => ({
-        chunk_text: r.chunk_text,
-        score: r.score,
-        metadata: {
-          video_title: r.video_title,
-          video_path: r.video_path,
-          video_id: r.video_id,
-          start_time: r.start_time,
-          end_time: r.end_time,
-          summary: r.paragraph_summary,
-          language: r.language,
-          source_type: r.source_type,
-        },
-      }));
+      references = contextResults.map(toReference);
     }
 
-    // Save chat history (关联用户 ID，如果已登录)
-    try {
-      await prisma.chatHistory.create({
-        data: {
-          sessionId,
-          userId,  // 可选用户关联
-          role: 'user',
-          content: body.query,
-          metadata: undefined,
-        },
-      });
-
-      await prisma.chatHistory.create({
-        data: {
-          sessionId,
-          userId,  // 可选用户关联
-          role: 'assistant',
-          content: answer,
-          metadata: { references } as any,
-        },
-      });
-    } catch (error) {
-      console.error('Failed to save chat history:', error);
-    }
+    // Save chat history in the background (关联用户 ID，如果已登录)
+    // 不阻塞响应，两条消息合并为一次 createMany 写入
+    saveChatPair(sessionId, userId, body.query, answer, references);
 
     return {
       answer,
-      references,
+      ...formatReferences(references, body.references_layout),
       query: body.query,
       session_id: sessionId,
     };
   });
 
   // Search
-  fastify.post('/api/qdrant/search', async (request: FastifyRequest, reply: FastifyReply) => {
+  fastify.post('/api/qdrant/search', {
+    schema: searchResponseSchema,
+  }, async (request: FastifyRequest, reply: FastifyReply) => {
     const body = searchRequestSchema.parse(request.body);
 
-    if (!await qdrantClient.checkConnection()) {
-      return reply.status(503).send({ detail: 'Cannot connect to Qdrant' });
-    }
-
-    const queryEmbedding = await embeddingService.embed(body.query);
+    const queryEmbedding = await embeddingService.embedQuery(body.query);
 
     const results = await qdrantClient.searchSimilar(
       queryEmbedding,
       body.n_results,
       body.score_threshold,
-      { language: body.language_filter }
+      { language: body.language_filter, folder_id: body.folder_id }
     );
 
     return {
-      results: results.map(r => ({
-        chunk_id: r.chunk_id,
-        video_title: r.video_title,
-        chunk_text: r.chunk_text,
-        summary: r.paragraph_summary,
-        start_time: r.start_time,
-        end_time: r.end_time,
-        score: r.score,
-        language: r.language,
-        source_type: r.source_type,
+      results: results.map(toSearchItem),
+    };
+  });
+
+  // Batch RAG Chat - 多个查询共用一次 embedding 请求和一次 Qdrant 批量检索
+  fastify.post('/api/qdrant/chat/batch', {
+    preHandler: optionalAuth,
+    schema: chatBatchResponseSchema,
+  }, async (request: FastifyRequest, reply: FastifyReply) => {
+    const body = chatBatchRequestSchema.parse(request.body);
+    const sessionId = body.session_id || randomUUID();
+    const userId = request.user ? parseInt(request.user.sub, 10) : null;
+
+    if (!config.ragEnabled) {
+      return reply.status(503).send({ detail: 'Qdrant RAG is disabled' });
+    }
+
+    const queryEmbeddings = await embeddingService.embedBatch(body.queries);
+
+    const batchResults = await qdrantClient.searchSimilarBatch(
+      queryEmbeddings,
+      body.n_results,
+      body.score_threshold,
+      { language: body.language_filter, folder_id: body.folder_id }
+    );
+
+    const items = await Promise.all(body.queries.map(async (query, i) => {
+      const results = batchResults[i] || [];
+      if (results.length === 0) {
+        return { answer: NO_RESULTS_ANSWER, references: [], query };
+      }
+
+      const contextResults = llmService.fitContextBudget(results, config.ragIncludeSummaries);
+      const ragContext = llmService.formatRagContext(contextResults, config.ragIncludeSummaries);
+      const answer = await llmService.chat(query, ragContext);
+      return { answer, references: contextResults.map(toReference), query };
+    }));
+
+    for (const item of items) {
+      saveChatPair(sessionId, userId, item.query, item.answer, item.references);
+    }
+
+    return {
+      results: items.map(item => ({
+        answer: item.answer,
+        ...formatReferences(item.references, body.references_layout),
+        query: item.query,
       })),
+      session_id: sessionId,
+    };
+  });
+
+  // Batch Search - 结果顺序与 queries 一致
+  fastify.post('/api/qdrant/search/batch', {
+    schema: searchBatchResponseSchema,
+  }, async (request: FastifyRequest, reply: FastifyReply) => {
+    const body = searchBatchRequestSchema.parse(request.body);
+
+    const queryEmbeddings = await embeddingService.embedBatch(body.queries);
+
+    const batchResults = await qdrantClient.searchSimilarBatch(
+      queryEmbeddings,
+      body.n_results,
+      body.score_threshold,
+      { language: body.language_filter, folder_id: body.folder_id }
+    );
+
+    return {
+      results: batchResults.map(results => results.map(toSearchItem)),
     };
   });
 
@@ -217,30 +443,43 @@ export async function qdrantRoutes(fastify: FastifyInstance) {
     const page = Math.max(1, parseInt(query.page || '1', 10));
     const pageSize = Math.min(100, Math.max(1, parseInt(query.page_size || '20', 10)));
     const folderId = query.folder_id;
+    const forceRefresh = query.force_refresh === 'true';
 
-    if (!await qdrantClient.checkConnection()) {
-      return reply.status(503).send({ detail: 'Qdrant connection unavailable' });
+    // 强制刷新走分页查询时不会重建完整列表缓存，先丢弃旧缓存，避免后续不带 force_refresh 的请求读到旧列表
+    if (forceRefresh) {
+      qdrantClient.invalidateVideoList();
     }
 
-    let videos = await qdrantClient.listAllVideos();
+    const cached = !forceRefresh && qdrantClient.isVideoListCached();
 
-    // Filter by folder if specified
-    if (folderId) {
-      videos = videos.filter(v => v.folder_id === folderId);
-    }
+    // 完整列表未缓存时，优先让 Qdrant 完成过滤和分页，只取当前页
+    const pageResult = cached ? null : await qdrantClient.listVideosPage(folderId, page, pageSize);
 
-    // Generate signed URLs for thumbnails
-    for (const video of videos) {
-      if (video.thumbnail_url && ossService.isOssUrl(video.thumbnail_url)) {
-        video.thumbnail_url = ossService.convertToSignedUrl(video.thumbnail_url, 86400);
-      }
+    let pageVideos: QdrantVideo[];
+    let total: number;
+
+    if (pageResult) {
+      pageVideos = pageResult.videos;
+      total = pageResult.total;
+    } else {
+      // Filter by folder if specified (O(1) lookup in the folder index)
+      const videos = folderId
+        ? await qdrantClient.listVideosInFolder(folderId, forceRefresh)
+        : await qdrantClient.listAllVideos(forceRefresh);
+
+      total = videos.length;
+      const startIdx = (page - 1) * pageSize;
+      pageVideos = videos.slice(startIdx, startIdx + pageSize);
     }
 
-    // Pagination
-    const total = videos.length;
     const totalPages = Math.ceil(total / pageSize);
-    const startIdx = (page - 1) * pageSize;
-    const paginatedVideos = videos.slice(startIdx, startIdx + pageSize);
+
+    // Generate signed URLs for thumbnails (only for the current page; copies keep the cache untouched)
+    const paginatedVideos = pageVideos.map(video => (
+      video.thumbnail_url && ossService.isOssUrl(video.thumbnail_url)
+        ? { ...video, thumbnail_url: ossService.convertToSignedUrl(video.thumbnail_url, 86400) }
+        : video
+    ));
 
     return {
       videos: paginatedVideos,
@@ -250,7 +489,7 @@ export async function qdrantRoutes(fastify: FastifyInstance) {
         total,
         total_pages: totalPages,
       },
-      cached: false,
+      cached,
     };
   });
 
@@ -258,10 +497,6 @@ export async function qdrantRoutes(fastify: FastifyInstance) {
   fastify.get('/api/qdrant/videos/:video_id/paragraphs', async (request: FastifyRequest, reply: FastifyReply) => {
     const { video_id } = request.params as { video_id: string };
 
-    if (!await qdrantClient.checkConnection()) {
-      return reply.status(503).send({ detail: 'Qdrant connection unavailable' });
-    }
-
     const result = await qdrantClient.getVideoParagraphsByVideoId(video_id);
 
     if (!result) {
@@ -278,10 +513,6 @@ export async function qdrantRoutes(fastify: FastifyInstance) {
 
   // List folders
   fastify.get('/api/qdrant/folders', async (request: FastifyRequest, reply: FastifyReply) => {
-    if (!await qdrantClient.checkConnection()) {
-      return reply.status(503).send({ detail: 'Qdrant connection unavailable' });
-    }
-
     const folders = await qdrantClient.listFolders();
 
     return {
@@ -326,12 +557,12 @@ export async function qdrantRoutes(fastify: FastifyInstance) {
     }
 
     // Auto-generate mindmap using LLM
-    if (!await qdrantClient.checkConnection()) {
-      return reply.status(503).send({ detail: 'Qdrant connection unavailable' });
-    }
-
     try {
-      const videoData = await qdrantClient.getVideoParagraphsByVideoId(video_id);
+      // 视频内容和提示词配置并发获取
+      const [videoData, mindmapPrompt] = await Promise.all([
+        qdrantClient.getVideoParagraphsByVideoId(video_id),
+        getMindmapPrompt(),
+      ]);
       if (!videoData) {
         return reply.status(404).send({ detail: `Video not found: ${video_id}` });
       }
@@ -351,17 +582,6 @@ export async function qdrantRoutes(fastify: FastifyInstance) {
         videoContent = videoContent.substring(0, 4000) + '\n...(内容过长，已截断)';
       }
 
-      // 获取提示词配置
-      let mindmapPrompt: string;
-      try {
-        const promptConfig = await prisma.systemConfig.findUnique({
-          where: { configKey: 'mindmap_prompt' },
-        });
-        mindmapPrompt = promptConfig?.configValue || getDefaultMindmapPrompt();
-      } catch {
-        mindmapPrompt = getDefaultMindmapPrompt();
-      }
-
       const mindmapMarkdown = await llmService.simpleChat([
         { role: 'system', content: '你是一个专业的思维导图生成助手，擅长从视频内容中提取关键信息并组织成清晰的思维导图结构。' },
         { role: 'user', content: `${mindmapPrompt}\n\n${videoContent}` },
@@ -385,6 +605,7 @@ export async function qdrantRoutes(fastify: FastifyInstance) {
         auto_generated: true,
       };
     } catch (error: any) {
+      if (error instanceof QdrantUnavailableError) throw error;
       console.error('Failed to generate mindmap:', error);
       return reply.status(500).send({
         detail: `Failed to generate mind map: ${error.message}`,
@@ -487,13 +708,12 @@ export async function qdrantRoutes(fastify: FastifyInstance) {
       }
     }
 
-    if (!await qdrantClient.checkConnection()) {
-      return reply.status(503).send({ detail: 'Qdrant connection unavailable' });
-    }
-
     try {
-      // 获取视频内容
-      const videoData = await qdrantClient.getVideoParagraphsByVideoId(video_id);
+      // 视频内容和提示词配置并发获取
+      const [videoData, mindmapPrompt] = await Promise.all([
+        qdrantClient.getVideoParagraphsByVideoId(video_id),
+        getMindmapPrompt(),
+      ]);
       if (!videoData) {
         return reply.status(404).send({ detail: `Video not found: ${video_id}` });
       }
@@ -513,17 +733,6 @@ export async function qdrantRoutes(fastify: FastifyInstance) {
         videoContent = videoContent.substring(0, 4000) + '\n...(内容过长，已截断)';
       }
 
-      // 获取思维导图提示词
-      let mindmapPrompt: string;
-      try {
-        const promptConfig = await prisma.systemConfig.findUnique({
-          where: { configKey: 'mindmap_prompt' },
-        });
-        mindmapPrompt = promptConfig?.configValue || getDefaultMindmapPrompt();
-      } catch {
-        mindmapPrompt = getDefaultMindmapPrompt();
-      }
-
       // 调用 LLM 生成思维导图
       const mindmapMarkdown = await llmService.simpleChat([
         { role: 'system', content: '你是一个专业的思维导图生成助手，擅长从视频内容中提取关键信息并组织成清晰的思维导图结构。' },
@@ -554,6 +763,7 @@ export async function qdrantRoutes(fastify: FastifyInstance) {
         saved: shouldSave,
       };
     } catch (error: any) {
+      if (error instanceof QdrantUnavailableError) throw error;
       console.error('Failed to generate mindmap:', error);
       return reply.status(500).send({
         detail: `生成思维导图失败: ${error.message}`,
@@ -589,10 +799,6 @@ export async function qdrantRoutes(fastify: FastifyInstance) {
   fastify.post('/api/qdrant/folders', async (request: FastifyRequest, reply: FastifyReply) => {
     const body = createFolderSchema.parse(request.body);
 
-    if (!await qdrantClient.checkConnection()) {
-      return reply.status(503).send({ detail: 'Qdrant connection unavailable' });
-    }
-
     const folderId = await qdrantClient.createFolder(body.name, body.parent_id || null);
 
     if (!folderId) {
@@ -616,10 +822,6 @@ export async function qdrantRoutes(fastify: FastifyInstance) {
     const { folder_id } = request.params as { folder_id: string };
     const body = updateFolderParentSchema.parse(request.body);
 
-    if (!await qdrantClient.checkConnection()) {
-      return reply.status(503).send({ detail: 'Qdrant connection unavailable' });
-    }
-
     const success = await qdrantClient.updateFolderParent(folder_id, body.parent_id);
 
     if (!success) {
@@ -639,10 +841,6 @@ export async function qdrantRoutes(fastify: FastifyInstance) {
     const { folder_id } = request.params as { folder_id: string };
     const body = renameFolderSchema.parse(request.body);
 
-    if (!await qdrantClient.checkConnection()) {
-      return reply.status(503).send({ detail: 'Qdrant connection unavailable' });
-    }
-
     const success = await qdrantClient.renameFolder(folder_id, body.new_name);
 
     if (!success) {
@@ -661,10 +859,6 @@ export async function qdrantRoutes(fastify: FastifyInstance) {
   fastify.delete('/api/qdrant/folders/:folder_id', async (request: FastifyRequest, reply: FastifyReply) => {
     const { folder_id } = request.params as { folder_id: string };
 
-    if (!await qdrantClient.checkConnection()) {
-      return reply.status(503).send({ detail: 'Qdrant connection unavailable' });
-    }
-
     const success = await qdrantClient.deleteFolder(folder_id);
 
     if (!success) {
@@ -690,10 +884,6 @@ export async function qdrantRoutes(fastify: FastifyInstance) {
       });
     }
 
-    if (!await qdrantClient.checkConnection()) {
-      return reply.status(503).send({ detail: 'Qdrant connection unavailable' });
-    }
-
     // 使用 video_id，如果没有则需要查找
     const videoId = body.video_id || body.video_path;
 
@@ -220,29 +220,27 @@ export async function transcriptRoutes(fastify: FastifyInstance) {
   fastify.post('/api/import/pyvideotrans', async (request: FastifyRequest, reply: FastifyReply) => {
     const body = importRequestSchema.parse(request.body);
 
-    // Save transcript
+    // Save transcript and summaries - 嵌套写入，一次请求、同一事务内完成
     const transcript = await prisma.transcript.create({
       data: {
         mediaPath: body.media_path,
         segmentsJson: JSON.stringify(body.segments),
+        summaries: body.paragraphs.length > 0
+          ? {
+              create: {
+                summariesJson: JSON.stringify(body.paragraphs.map(p => ({
+                  text: p.text,
+                  summary: p.summary,
+                  start_time: p.start_time,
+                  end_time: p.end_time,
+                }))),
+              },
+            }
+          : undefined,
       },
+      select: { id: true },
     });
 
-    // Save summaries
-    if (body.paragraphs.length > 0) {
-      await prisma.summary.create({
-        data: {
-          transcriptId: transcript.id,
-          summariesJson: JSON.stringify(body.paragraphs.map(p => ({
-            text: p.text,
-            summary: p.summary,
-            start_time: p.start_time,
-            end_time: p.end_time,
-          }))),
-        },
-      });
-    }
-
     return {
       success: true,
       transcript_id: transcript.id,
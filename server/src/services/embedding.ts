@@ -1,78 +1,259 @@
+import crypto from 'crypto';
 import { config } from '../utils/config.js';
+import { LruCache } from '../utils/cache.js';
+
+const QUERY_CACHE_SIZE = 1024;
+const TEXT_CACHE_SIZE = 2048;
+const MAX_RETRIES = 3;
+const RETRY_BACKOFF_MS = 300;
+const BATCH_SHARD_SIZE = 32;
+const BATCH_CONCURRENCY = 8;
+const MICRO_BATCH_MAX = 64;
+const MICRO_BATCH_WAIT_MS = 5;
+const RETRY_STATUSES = new Set([429, 500, 502, 503, 504]);
+
+interface EmbeddingResponse {
+  // encoding_format=base64 时为小端 float32 的 base64 字符串
+  data: Array<{ embedding: number[] | string }>;
+}
+
+/**
+ * Embedding API 返回的非 2xx 响应（重试用尽后）
+ */
+class EmbeddingApiError extends Error {
+  constructor(public status: number, body: string) {
+    super(`Embedding API error: ${status} - ${body}`);
+    this.name = 'EmbeddingApiError';
+  }
+}
+
+/**
+ * 除 429 以外的 4xx：请求本身有问题（如某条文本超长），重发同一批不会成功
+ */
+function isClientError(error: unknown): boolean {
+  return error instanceof EmbeddingApiError &&
+    error.status >= 400 && error.status < 500 && !RETRY_STATUSES.has(error.status);
+}
+
+function decodeEmbedding(embedding: number[] | string): Float32Array {
+  if (typeof embedding !== 'string') return Float32Array.from(embedding);
+
+  const bytes = Buffer.from(embedding, 'base64');
+  // 复制到新的 ArrayBuffer，保证 4 字节对齐
+  return new Float32Array(bytes.buffer.slice(bytes.byteOffset, bytes.byteOffset + bytes.byteLength));
+}
 
 /**
  * Embedding Service - Calls SiliconFlow API (or compatible)
  * Same as pyvideotrans uses BAAI/bge-large-zh-v1.5
  */
 export class EmbeddingService {
-  private apiUrl: string;
-  private apiKey: string;
   private model: string;
+  private encodingFormat: 'float' | 'base64';
+  private endpoint: string;
+  private headers: Record<string, string>;
+  // 内部及缓存统一用 Float32Array 保存向量（API 返回的精度即为 float32），内存约为 number[] 的一半
+  // 只在对外接口处转换一次为 number[]
+  private queryCache = new LruCache<string, Float32Array>(QUERY_CACHE_SIZE);
+  private textCache = new LruCache<string, Float32Array>(TEXT_CACHE_SIZE);  // key: model + 文本哈希
+  // 等待合并发送的单条 embed 请求
+  private pending: Array<{
+    text: string;
+    resolve: (vector: Float32Array) => void;
+    reject: (error: unknown) => void;
+  }> = [];
+  private flushTimer: NodeJS.Timeout | null = null;
 
   constructor(
     apiUrl: string = config.embeddingApiUrl,
     apiKey: string = config.embeddingApiKey,
-    model: string = config.embeddingModel
+    model: string = config.embeddingModel,
+    encodingFormat: 'float' | 'base64' = config.embeddingEncodingFormat
   ) {
-    this.apiUrl = apiUrl;
-    this.apiKey = apiKey;
     this.model = model;
+    this.encodingFormat = encodingFormat;
+    this.endpoint = `${apiUrl}/embeddings`;
+    this.headers = {
+      'Authorization': `Bearer ${apiKey}`,
+      'Content-Type': 'application/json',
+    };
   }
 
+  /**
+   * Embed a single text
+   * MICRO_BATCH_WAIT_MS 内的并发调用合并为一次批量请求（最多 MICRO_BATCH_MAX 条）
+   */
   async embed(text: string): Promise<number[]> {
-    const response = await fetch(`${this.apiUrl}/embeddings`, {
-      method: 'POST',
-      headers: {
-        'Authorization': `Bearer ${this.apiKey}`,
-        'Content-Type': 'application/json',
-      },
-      body: JSON.stringify({
-        model: this.model,
-        input: text,
-        encoding_format: 'float',
-      }),
+    return Array.from(await this.embedVector(text));
+  }
+
+  /**
+   * Embed a user query, reusing cached vectors for repeated queries
+   * Key is model + normalized text (trimmed, lowercased, collapsed whitespace)
+   */
+  async embedQuery(query: string): Promise<number[]> {
+    const key = `${this.model}:${query.trim().toLowerCase().replace(/\s+/g, ' ')}`;
+
+    let vector = this.queryCache.get(key);
+    if (!vector) {
+      vector = await this.embedVector(query);
+      this.queryCache.set(key, vector);
+    }
+    return Array.from(vector);
+  }
+
+  /**
+   * 批量 embedding：命中缓存的文本和批内重复文本不再请求，返回顺序与输入一致
+   */
+  async embedBatch(texts: string[]): Promise<number[][]> {
+    const vectors = await this.embedVectors(texts);
+    return vectors.map(vector => Array.from(vector));
+  }
+
+  private embedVector(text: string): Promise<Float32Array> {
+    const cached = this.textCache.get(this.textCacheKey(text));
+    if (cached) return Promise.resolve(cached);
+
+    return new Promise((resolve, reject) => {
+      this.pending.push({ text, resolve, reject });
+
+      if (this.pending.length >= MICRO_BATCH_MAX) {
+        this.flushPending();
+      } else if (!this.flushTimer) {
+        this.flushTimer = setTimeout(() => this.flushPending(), MICRO_BATCH_WAIT_MS);
+      }
     });
+  }
 
-    if (!response.ok) {
-      const error = await response.text();
-      throw new Error(`Embedding API error: ${response.status} - ${error}`);
+  private flushPending(): void {
+    if (this.flushTimer) {
+      clearTimeout(this.flushTimer);
+      this.flushTimer = null;
     }
 
-    const data = await response.json() as {
-      data: Array<{ embedding: number[] }>;
-    };
+    const batch = this.pending;
+    this.pending = [];
 
-    if (!data.data || !data.data[0] || !data.data[0].embedding) {
-      throw new Error('Invalid embedding response');
+    this.embedVectors(batch.map(p => p.text)).then(
+      vectors => batch.forEach((p, i) => p.resolve(vectors[i])),
+      error => {
+        // 合并后的请求因某条输入被拒时逐条重发，只让有问题的那条失败
+        if (batch.length > 1 && isClientError(error)) {
+          for (const p of batch) {
+            this.embedVectors([p.text]).then(vectors => p.resolve(vectors[0]), p.reject);
+          }
+        } else {
+          batch.forEach(p => p.reject(error));
+        }
+      }
+    );
+  }
+
+  private async embedVectors(texts: string[]): Promise<Float32Array[]> {
+    const keys = texts.map(text => this.textCacheKey(text));
+    const results: (Float32Array | undefined)[] = keys.map(key => this.textCache.get(key));
+
+    // 未命中的文本去重后再请求
+    const missIndexes = new Map<string, number>();
+    for (let i = 0; i < texts.length; i++) {
+      if (!results[i] && !missIndexes.has(keys[i])) {
+        missIndexes.set(keys[i], i);
+      }
+    }
+
+    if (missIndexes.size > 0) {
+      const missTexts = [...missIndexes.values()].map(i => texts[i]);
+      const vectors = await this.fetchBatch(missTexts);
+
+      const fetched = new Map<string, Float32Array>();
+      let j = 0;
+      for (const key of missIndexes.keys()) {
+        fetched.set(key, vectors[j]);
+        this.textCache.set(key, vectors[j++]);
+      }
+      for (let i = 0; i < texts.length; i++) {
+        if (!results[i]) {
+          results[i] = fetched.get(keys[i]);
+        }
+      }
     }
 
-    return data.data[0].embedding;
+    return results as Float32Array[];
   }
 
-  async embedBatch(texts: string[]): Promise<number[][]> {
-    const response = await fetch(`${this.apiUrl}/embeddings`, {
-      method: 'POST',
-      headers: {
-        'Authorization': `Bearer ${this.apiKey}`,
-        'Content-Type': 'application/json',
-      },
-      body: JSON.stringify({
-        model: this.model,
-        input: texts,
-        encoding_format: 'float',
-      }),
-    });
+  /**
+   * 按 BATCH_SHARD_SIZE 分片请求，最多 BATCH_CONCURRENCY 个请求并发，返回顺序与输入一致
+   */
+  private async fetchBatch(texts: string[]): Promise<Float32Array[]> {
+    if (texts.length <= BATCH_SHARD_SIZE) {
+      return this.requestEmbeddings(texts);
+    }
 
-    if (!response.ok) {
-      const error = await response.text();
-      throw new Error(`Embedding API error: ${response.status} - ${error}`);
+    const shards: string[][] = [];
+    for (let i = 0; i < texts.length; i += BATCH_SHARD_SIZE) {
+      shards.push(texts.slice(i, i + BATCH_SHARD_SIZE));
     }
 
-    const data = await response.json() as {
-      data: Array<{ embedding: number[] }>;
+    const shardResults: Float32Array[][] = new Array(shards.length);
+    let nextShard = 0;
+
+    const worker = async () => {
+      while (nextShard < shards.length) {
+        const index = nextShard++;
+        shardResults[index] = await this.requestEmbeddings(shards[index]);
+      }
     };
 
-    return data.data.map(d => d.embedding);
+    await Promise.all(
+      Array.from({ length: Math.min(BATCH_CONCURRENCY, shards.length) }, worker)
+    );
+
+    return shardResults.flat();
+  }
+
+  private async requestEmbeddings(texts: string[]): Promise<Float32Array[]> {
+    const data = await this.request(texts);
+
+    if (!data.data || data.data.length !== texts.length || data.data.some(d => !d.embedding)) {
+      throw new Error('Invalid embedding response');
+    }
+
+    return data.data.map(d => decodeEmbedding(d.embedding));
+  }
+
+  private textCacheKey(text: string): string {
+    return `${this.model}:${crypto.createHash('sha1').update(text).digest('base64')}`;
+  }
+
+  /**
+   * POST /embeddings，429 和 5xx 按 0.3s/0.6s/1.2s 退避重试
+   * 连接由 fetch 的全局连接池复用（keep-alive），请求头只构建一次
+   */
+  private async request(input: string[]): Promise<EmbeddingResponse> {
+    for (let attempt = 0; ; attempt++) {
+      const response = await fetch(this.endpoint, {
+        method: 'POST',
+        headers: this.headers,
+        body: JSON.stringify({
+          model: this.model,
+          input,
+          encoding_format: this.encodingFormat,
+        }),
+      });
+
+      if (response.ok) {
+        return await response.json() as EmbeddingResponse;
+      }
+
+      if (attempt < MAX_RETRIES && RETRY_STATUSES.has(response.status)) {
+        await response.body?.cancel();
+        await new Promise(resolve => setTimeout(resolve, RETRY_BACKOFF_MS * 2 ** attempt));
+        continue;
+      }
+
+      const error = await response.text();
+      throw new EmbeddingApiError(response.status, error);
+    }
   }
 }
 
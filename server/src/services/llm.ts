@@ -2,12 +2,23 @@ import OpenAI from 'openai';
 import { config } from '../utils/config.js';
 import type { QdrantSearchResult } from '../types/index.js';
 
+const DEFAULT_RAG_SYSTEM_PROMPT =
+  '你是一个专业的视频内容问答助手。请基于提供的视频内容回答用户的问题，并在回答中引用相关来源。';
+
+/**
+ * 粗略估算 token 数：按 UTF-8 字节数 / 3（中文约 1 字 1 token，英文偏保守）
+ */
+function estimateTokens(text: string): number {
+  return Math.ceil(Buffer.byteLength(text, 'utf8') / 3);
+}
+
 /**
  * LLM Service - OpenAI compatible API
  */
 export class LlmService {
   private client: OpenAI;
   private model: string;
+  private maxContextTokens: number;
 
   constructor() {
     this.client = new OpenAI({
@@ -15,6 +26,42 @@ export class LlmService {
       baseURL: config.openaiBaseUrl,
     });
     this.model = config.openaiModel;
+    this.maxContextTokens = config.ragMaxContextTokens;
+  }
+
+  /**
+   * 按 token 预算裁剪检索结果：按分数从高到低累加，超出预算的低分结果被丢弃
+   * 至少保留得分最高的一条，返回结果保持原有顺序
+   */
+  fitContextBudget(results: QdrantSearchResult[], includeSummaries: boolean = true): QdrantSearchResult[] {
+    if (results.length <= 1) {
+      return results;
+    }
+
+    const ranked = results
+      .map((r, index) => ({ r, index }))
+      .sort((a, b) => b.r.score - a.r.score);
+
+    const kept = new Set<number>();
+    let usedTokens = 0;
+
+    for (const { r, index } of ranked) {
+      let tokens = estimateTokens(r.chunk_text) + estimateTokens(r.video_title);
+      if (includeSummaries && r.paragraph_summary) {
+        tokens += estimateTokens(r.paragraph_summary);
+      }
+
+      if (kept.size > 0 && usedTokens + tokens > this.maxContextTokens) {
+        break;
+      }
+      kept.add(index);
+      usedTokens += tokens;
+    }
+
+    if (kept.size === results.length) {
+      return results;
+    }
+    return results.filter((_, index) => kept.has(index));
   }
 
   /**
@@ -70,8 +117,7 @@ ${context}
     ragContext: string,
     systemPrompt?: string
   ): Promise<string> {
-    const basePrompt = systemPrompt ||
-      '你是一个专业的视频内容问答助手。请基于提供的视频内容回答用户的问题，并在回答中引用相关来源。';
+    const basePrompt = systemPrompt || DEFAULT_RAG_SYSTEM_PROMPT;
 
     const fullSystemPrompt = this.formatRagSystemPrompt(basePrompt, ragContext);
 
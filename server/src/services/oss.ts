@@ -1,42 +1,65 @@
 import OSS from 'ali-oss';
 import { config } from '../utils/config.js';
 
+// 与原先的三次 includes 判断等价：.aliyuncs.com / .oss- / oss-cn-
+const OSS_URL_PATTERN = /\.aliyuncs\.com|\.oss-|oss-cn-/;
+
+/**
+ * 已签名的 OSS URL 剩余有效期是否不少于 minRemainingSec（V1 签名：Signature + Expires 时间戳，单位秒）
+ * 调用方请求的有效期比剩余有效期长时需要重新签名
+ */
+function isValidSignedUrl(url: string, minRemainingSec: number): boolean {
+  if (!url.includes('Signature=')) return false;
+  try {
+    const expires = Number(new URL(url).searchParams.get('Expires'));
+    return expires >= Date.now() / 1000 + minRemainingSec;
+  } catch {
+    return false;
+  }
+}
+
 /**
  * Aliyun OSS Client for video storage
  */
 export class OssService {
-  private client: OSS | null = null;
+  private clientInstance: OSS | null = null;
   private enabled: boolean;
+  private configured: boolean;  // 已启用且配置了访问密钥
   private bucket: string;
 
   constructor() {
     this.enabled = config.ossEnabled;
     this.bucket = config.ossBucket || '';
 
-    if (this.enabled && config.ossAccessKeyId && config.ossAccessKeySecret) {
-      this.client = new OSS({
+    this.configured = this.enabled && !!config.ossAccessKeyId && !!config.ossAccessKeySecret;
+  }
+
+  /**
+   * OSS 客户端在第一次真正调用时才创建，从不访问 OSS 的进程不付出初始化开销
+   */
+  private get client(): OSS | null {
+    if (!this.clientInstance && this.configured) {
+      this.clientInstance = new OSS({
         region: config.ossRegion || 'oss-cn-hangzhou',
-        accessKeyId: config.ossAccessKeyId,
-        accessKeySecret: config.ossAccessKeySecret,
+        accessKeyId: config.ossAccessKeyId!,
+        accessKeySecret: config.ossAccessKeySecret!,
         bucket: this.bucket,
         endpoint: config.ossEndpoint,
       });
       console.log('✅ OSS client initialized');
     }
+    return this.clientInstance;
   }
 
   isEnabled(): boolean {
-    return this.enabled && this.client !== null;
+    return this.configured;
   }
 
   /**
    * Check if a URL is an OSS URL
    */
   isOssUrl(url: string): boolean {
-    if (!url) return false;
-    return url.includes('.aliyuncs.com') ||
-           url.includes('.oss-') ||
-           url.includes('oss-cn-');
+    return !!url && OSS_URL_PATTERN.test(url);
   }
 
   /**
@@ -82,6 +105,11 @@ export class OssService {
       return url;
     }
 
+    // 已签名且剩余有效期不短于本次请求的 expires，跳过重新签名
+    if (isValidSignedUrl(url, expires)) {
+      return url;
+    }
+
     const signedUrl = this.generateSignedUrl(url, expires);
     return signedUrl || url;
   }
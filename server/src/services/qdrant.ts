@@ -1,15 +1,141 @@
 import { QdrantClient } from '@qdrant/js-client-rest';
 import { config } from '../utils/config.js';
+import { LruCache, SemanticCache, TtlCache, normalizeVector } from '../utils/cache.js';
 import type { QdrantSearchResult, QdrantVideo } from '../types/index.js';
 
+// 视频列表只需要这些 payload 字段（type 用于排除 folder_registry）
+const VIDEO_PAYLOAD_FIELDS = [
+  'type',
+  'video_id',
+  'video_path',
+  'video_title',
+  'video_summary',
+  'total_segments',
+  'total_duration',
+  'language',
+  'source_type',
+  'folder',
+  'folder_id',
+  'thumbnail_url',
+];
+
+// 检索结果只读取这些字段（见 toSearchResult）
+const SEARCH_PAYLOAD_FIELDS = [
+  'chunk_text',
+  'paragraph_summary',
+  'video_title',
+  'video_path',
+  'video_id',
+  'language',
+  'start_time',
+  'end_time',
+  'source_type',
+];
+
+// 需要 keyword 索引的过滤字段，按 collection 分别列出
+// chunks：检索过滤（buildFilter）和按视频删除；metadata：视频查找、文件夹归类、排除 folder_registry
+const CHUNK_INDEX_FIELDS = ['video_id', 'language', 'source_type'];
+const METADATA_INDEX_FIELDS = ['video_id', 'folder_id', 'type'];
+
+const EMPTY_PAYLOAD: Record<string, unknown> = Object.freeze({});
+
+type PayloadSelector = boolean | { include: string[] };
+
+type SearchFilter = {
+  must: Array<{ key: string; match: { value: string } | { any: string[] } }>;
+};
+
+type SearchConditions = {
+  language?: string;
+  source_type?: string;
+  video_id?: string;
+  folder_id?: string;
+};
+
+const SEARCH_FILTER_CACHE_SIZE = 128;
+
+// 量化检索参数：先用量化向量召回 2 倍候选，再用原始向量重新打分
+// collection 未开启量化时 Qdrant 会忽略该参数
+const QUANTIZED_SEARCH_PARAMS = {
+  quantization: { rescore: true, oversampling: 2.0 },
+};
+
+// 语义检索缓存：相似度 >= 0.98 的查询向量直接复用上次的检索结果
+// （缓存键量化为 int8，阈值比原始余弦略高以抵消量化误差）
+// pyvideotrans 写入的新数据与视频列表一样最多 60 秒后可见
+const SEARCH_CACHE_SIZE = 512;
+const SEARCH_CACHE_TTL_MS = 60 * 1000;
+const SEARCH_CACHE_MIN_SIMILARITY = 0.98;
+
+const SCROLL_PAGE_SIZE = 256;
+
+const FOLDER_REGISTRY_ID = '00000000-0000-0000-0000-000000000001';
+
+interface Folder {
+  folder_id: string;
+  name: string;
+  video_count: number;
+  parent_id: string | null;
+}
+
+const VIDEO_LIST_CACHE_TTL_MS = 60 * 1000;
+const VIDEO_LIST_CACHE_KEY = 'all';
+
+/**
+ * Qdrant 无法连接（网络错误、超时等，而非 Qdrant 返回的 HTTP 错误）
+ * 由全局错误处理统一转换为 503
+ */
+export class QdrantUnavailableError extends Error {
+  constructor(cause?: unknown) {
+    super('Cannot connect to Qdrant', { cause });
+    this.name = 'QdrantUnavailableError';
+  }
+}
+
+/**
+ * 网络层错误（连接被拒、DNS 失败、超时），请求没有到达 Qdrant
+ * Qdrant 返回的 HTTP 错误不算在内
+ */
+function isConnectionError(error: unknown): boolean {
+  if (!(error instanceof Error)) return false;
+  if (error.name === 'AbortError' || error.name === 'TimeoutError') return true;
+  if (error instanceof TypeError && error.message === 'fetch failed') return true;
+  return typeof (error.cause as { code?: unknown } | undefined)?.code === 'string';
+}
+
+/**
+ * 在 catch 中调用：Qdrant 不可用时向上抛出，交给全局错误处理返回 503
+ */
+function rethrowIfUnavailable(error: unknown): void {
+  if (error instanceof QdrantUnavailableError) throw error;
+  if (isConnectionError(error)) throw new QdrantUnavailableError(error);
+}
+
 /**
- * Qdrant Client for HearSight (READ-ONLY)
- * All write operations are handled by pyvideotrans
+ * Qdrant Client for HearSight
+ * 视频与 chunk 数据由 pyvideotrans 写入；本服务负责文件夹归类、删除视频，
+ * 并可在启动时按配置创建 payload 索引、开启量化（修改 collection schema）
  */
 export class VideoQdrantClient {
   private client: QdrantClient;
   private collectionChunks: string;
   private collectionMetadata: string;
+  private lastConnectionOk: boolean | null = null;
+  private searchFilterCache = new LruCache<string, SearchFilter>(SEARCH_FILTER_CACHE_SIZE);
+  private searchCache = new SemanticCache<QdrantSearchResult[]>(
+    SEARCH_CACHE_SIZE,
+    SEARCH_CACHE_TTL_MS,
+    SEARCH_CACHE_MIN_SIMILARITY
+  );
+  private videoListCache = new TtlCache<string, QdrantVideo[]>(VIDEO_LIST_CACHE_TTL_MS);
+  // 文件夹索引随缓存的视频列表一起失效（以列表数组为 key）
+  private folderIndexes = new WeakMap<QdrantVideo[], Map<string | null, QdrantVideo[]>>();
+  // 分页游标缓存: `${folderId}:${pageSize}:${page}` -> 该页的 scroll offset
+  private pageCursorCache = new TtlCache<string, string | number>(VIDEO_LIST_CACHE_TTL_MS);
+  // 文件夹检索 filter，以该文件夹的视频数组为 key（随视频列表缓存一起失效）
+  private folderFilters = new WeakMap<QdrantVideo[], Map<string, { filter: SearchFilter; key: string }>>();
+  private folderFilterSeq = 0;
+  private folderRegistryCache = new TtlCache<string, Folder[]>(VIDEO_LIST_CACHE_TTL_MS);
 
   constructor(
     url: string = config.qdrantUrl,
@@ -24,141 +150,468 @@ export class VideoQdrantClient {
     this.collectionMetadata = `${collectionPrefix}_metadata`;
   }
 
+  /**
+   * 检查连接，只在状态变化时输出日志（避免健康检查轮询刷屏）
+   */
   async checkConnection(): Promise<boolean> {
     try {
       const collections = await this.client.getCollections();
-      console.log(`✅ Qdrant connected, found ${collections.collections.length} collections`);
+      if (this.lastConnectionOk !== true) {
+        console.log(`✅ Qdrant connected, found ${collections.collections.length} collections`);
+      }
+      this.lastConnectionOk = true;
       return true;
     } catch (error) {
-      console.warn('⚠️ Qdrant connection failed:', error);
+      if (this.lastConnectionOk !== false) {
+        console.warn('⚠️ Qdrant connection failed:', error);
+      }
+      this.lastConnectionOk = false;
       return false;
     }
   }
 
+  /**
+   * 构建检索过滤条件；条件组合固定且有限，按取值缓存复用同一个对象
+   */
+  private buildSearchFilter(
+    filterConditions?: SearchConditions
+  ): SearchFilter | undefined {
+    const language = filterConditions?.language || '';
+    const sourceType = filterConditions?.source_type || '';
+    const videoId = filterConditions?.video_id || '';
+    if (!language && !sourceType && !videoId) return undefined;
+
+    const cacheKey = `${language}\n${sourceType}\n${videoId}`;
+    const cached = this.searchFilterCache.get(cacheKey);
+    if (cached) return cached;
+
+    const mustConditions: SearchFilter['must'] = [];
+
+    if (language) {
+      mustConditions.push({
+        key: 'language',
+        match: { value: language },
+      });
+    }
+    if (sourceType) {
+      mustConditions.push({
+        key: 'source_type',
+        match: { value: sourceType },
+      });
+    }
+    if (videoId) {
+      mustConditions.push({
+        key: 'video_id',
+        match: { value: videoId },
+      });
+    }
+
+    const filter = { must: mustConditions };
+    this.searchFilterCache.set(cacheKey, filter);
+    return filter;
+  }
+
+  /**
+   * 按单个 video_id 过滤（统计、分段、归档、删除共用）
+   * 不放进 searchFilterCache：按视频逐个统计时会挤掉检索用的过滤条件
+   */
+  private videoFilter(videoId: string): SearchFilter {
+    return { must: [{ key: 'video_id', match: { value: videoId } }] };
+  }
+
+  /**
+   * 解析检索过滤条件，返回 filter 及其缓存键；文件夹为空时返回 null
+   * 按文件夹检索用一个 MatchAny 条件匹配文件夹内所有视频，video_id 来自缓存的文件夹索引（无额外请求）
+   * 文件夹 filter 按该文件夹的视频数组缓存，视频列表刷新后自动重建
+   */
+  private async resolveSearchFilter(
+    filterConditions?: SearchConditions
+  ): Promise<{ filter?: SearchFilter; key: string } | null> {
+    const baseFilter = this.buildSearchFilter(filterConditions);
+    const baseKey = JSON.stringify(baseFilter ?? null);
+
+    const folderId = filterConditions?.folder_id;
+    if (!folderId) return { filter: baseFilter, key: baseKey };
+
+    const videos = await this.listVideosInFolder(folderId);
+    if (videos.length === 0) return null;
+
+    let filters = this.folderFilters.get(videos);
+    if (!filters) {
+      filters = new Map();
+      this.folderFilters.set(videos, filters);
+    }
+
+    let resolved = filters.get(baseKey);
+    if (!resolved) {
+      resolved = {
+        filter: {
+          must: [
+            ...(baseFilter?.must || []),
+            { key: 'video_id', match: { any: videos.map(v => v.video_id) } },
+          ],
+        },
+        // 序号区分同一文件夹的不同成员快照，避免语义缓存返回旧成员的结果
+        key: `folder:${folderId}:${this.folderFilterSeq++}:${baseKey}`,
+      };
+      filters.set(baseKey, resolved);
+    }
+    return resolved;
+  }
+
+  private toSearchResult(hit: {
+    id: string | number;
+    score: number;
+    payload?: Record<string, unknown> | null;
+  }): QdrantSearchResult {
+    // 取一次 payload，之后按固定顺序读取字段，结果对象保持同一形状
+    const payload = hit.payload || EMPTY_PAYLOAD;
+    return {
+      chunk_id: String(hit.id),
+      score: hit.score,
+      chunk_text: (payload.chunk_text as string) || '',
+      paragraph_summary: (payload.paragraph_summary as string) || null,
+      video_title: (payload.video_title as string) || '',
+      video_path: (payload.video_path as string) || null,
+      video_id: (payload.video_id as string) || null,
+      language: (payload.language as string) || '',
+      start_time: (payload.start_time as number) || 0,
+      end_time: (payload.end_time as number) || 0,
+      source_type: (payload.source_type as string) || '',
+    };
+  }
+
+  /**
+   * 为 chunks collection 开启量化（常驻内存），已开启时跳过
+   * binary: 每维 1 bit，压缩 32 倍；scalar: int8，压缩 4 倍，召回损失更小
+   * 已有的量化方式与配置不同时只打印警告，不自动切换（切换需要重建量化数据）
+   */
+  async ensureQuantization(mode: 'binary' | 'scalar'): Promise<void> {
+    try {
+      const info = await this.client.getCollection(this.collectionChunks);
+      const existing = info.config?.quantization_config;
+      if (existing) {
+        const existingMode = Object.keys(existing)[0];
+        if (existingMode !== mode) {
+          console.warn(
+            `⚠️ ${this.collectionChunks} already uses ${existingMode} quantization, ` +
+            `ignoring QDRANT_QUANTIZATION=${mode}`
+          );
+        }
+        return;
+      }
+
+      await this.client.updateCollection(this.collectionChunks, {
+        quantization_config: mode === 'binary'
+          ? { binary: { always_ram: true } }
+          : { scalar: { type: 'int8', quantile: 0.99, always_ram: true } },
+      });
+      console.log(`✅ ${mode} quantization enabled on ${this.collectionChunks}`);
+    } catch (error) {
+      console.warn(`⚠️ Failed to enable ${mode} quantization:`, error);
+    }
+  }
+
+  /**
+   * 为常用过滤字段创建 keyword payload 索引，已存在的跳过
+   * 没有索引时这些过滤条件需要 Qdrant 逐点扫描 payload
+   */
+  async ensurePayloadIndexes(): Promise<void> {
+    const targets: Array<[string, string[]]> = [
+      [this.collectionChunks, CHUNK_INDEX_FIELDS],
+      [this.collectionMetadata, METADATA_INDEX_FIELDS],
+    ];
+
+    for (const [collection, fields] of targets) {
+      try {
+        const info = await this.client.getCollection(collection);
+        const existing = info.payload_schema || {};
+
+        for (const field of fields) {
+          if (existing[field]) continue;
+          await this.client.createPayloadIndex(collection, {
+            field_name: field,
+            field_schema: 'keyword',
+            wait: true,
+          });
+          console.log(`✅ Created payload index ${collection}.${field}`);
+        }
+      } catch (error) {
+        console.warn(`⚠️ Failed to ensure payload indexes on ${collection}:`, error);
+      }
+    }
+  }
+
   async searchSimilar(
     queryVector: number[],
     limit: number = 5,
     scoreThreshold: number = 0.7,
-    filterConditions?: { language?: string; source_type?: string; video_id?: string }
+    filterConditions?: SearchConditions
   ): Promise<QdrantSearchResult[]> {
-    try {
-      // Build filter
-      const mustConditions: Array<{
-        key: string;
-        match: { value: string };
-      }> = [];
-
-      if (filterConditions?.language) {
-        mustConditions.push({
-          key: 'language',
-          match: { value: filterConditions.language },
-        });
-      }
-      if (filterConditions?.source_type) {
-        mustConditions.push({
-          key: 'source_type',
-          match: { value: filterConditions.source_type },
-        });
-      }
-      if (filterConditions?.video_id) {
-        mustConditions.push({
-          key: 'video_id',
-          match: { value: filterConditions.video_id },
-        });
-      }
+    const [results] = await this.searchSimilarBatch([queryVector], limit, scoreThreshold, filterConditions);
+    return results;
+  }
+
+  /**
+   * 批量向量检索 - 一次请求完成多个查询，结果顺序与输入一致
+   * 命中语义缓存的查询不再发送，其余查询共用同一个过滤条件
+   */
+  async searchSimilarBatch(
+    queryVectors: number[][],
+    limit: number = 5,
+    scoreThreshold: number = 0.7,
+    filterConditions?: SearchConditions
+  ): Promise<QdrantSearchResult[][]> {
+    if (queryVectors.length === 0) return [];
+
+    const resolved = await this.resolveSearchFilter(filterConditions);
+    if (!resolved) return queryVectors.map(() => []);
+
+    const { filter } = resolved;
+    const cacheBucket = `${limit}:${scoreThreshold}:${resolved.key}`;
+
+    const unitVectors = queryVectors.map(vector => normalizeVector(vector));
+    const results = unitVectors.map(vector => this.searchCache.get(cacheBucket, vector));
+    const missIndexes = results.flatMap((cached, i) => (cached ? [] : [i]));
+    if (missIndexes.length === 0) return results as QdrantSearchResult[][];
 
-      const results = await this.client.search(this.collectionChunks, {
-        vector: queryVector,
+    try {
+      const searches = missIndexes.map(i => ({
+        vector: queryVectors[i],
         limit,
         score_threshold: scoreThreshold,
-        filter: mustConditions.length > 0 ? { must: mustConditions } : undefined,
+        filter,
+        params: QUANTIZED_SEARCH_PARAMS,
+        with_payload: { include: SEARCH_PAYLOAD_FIELDS },
+      }));
+
+      // 单个查询走 search，避免 batch 接口的额外包装
+      const hitLists = searches.length === 1
+        ? [await this.client.search(this.collectionChunks, searches[0])]
+        : await this.client.searchBatch(this.collectionChunks, { searches });
+
+      missIndexes.forEach((queryIndex, j) => {
+        const searchResults = (hitLists[j] || []).map(hit => this.toSearchResult(hit));
+        this.searchCache.set(cacheBucket, unitVectors[queryIndex], searchResults);
+        results[queryIndex] = searchResults;
       });
 
-      return results.map(hit => ({
-        chunk_id: String(hit.id),
-        score: hit.score,
-        chunk_text: (hit.payload?.chunk_text as string) || '',
-        paragraph_summary: (hit.payload?.paragraph_summary as string) || null,
-        video_title: (hit.payload?.video_title as string) || '',
-        video_path: (hit.payload?.video_path as string) || null,
-        video_id: (hit.payload?.video_id as string) || null,
-        language: (hit.payload?.language as string) || '',
-        start_time: (hit.payload?.start_time as number) || 0,
-        end_time: (hit.payload?.end_time as number) || 0,
-        source_type: (hit.payload?.source_type as string) || '',
-      }));
+      return results as QdrantSearchResult[][];
     } catch (error) {
+      rethrowIfUnavailable(error);
       console.error('Qdrant search failed:', error);
-      return [];
+      return results.map(cached => cached || []);
     }
   }
 
-  async listAllVideos(): Promise<QdrantVideo[]> {
+  /**
+   * 获取所有视频元数据（带 TTL 缓存，并发请求共享同一次 scroll）
+   * 返回的数组是共享缓存，调用方不要原地修改
+   */
+  async listAllVideos(forceRefresh: boolean = false): Promise<QdrantVideo[]> {
     try {
-      const results = await this.client.scroll(this.collectionMetadata, {
-        limit: 1000,
-        with_payload: true,
-        with_vector: false,
-      });
-
-      // 过滤掉 folder_registry 类型的记录
-      const videoPoints = results.points.filter(point => {
-        const payload = point.payload || {};
-        return payload.type !== 'folder_registry';
-      });
-
-      return videoPoints.map(point => {
-        const payload = point.payload || {};
-        return {
-          video_id: (payload.video_id as string) || String(point.id),
-          video_path: (payload.video_path as string) || null,
-          video_title: (payload.video_title as string) || null,
-          topic: (payload.video_title as string) || null,
-          video_summary: (payload.video_summary as string) || null,
-          total_segments: (payload.total_segments as number) || 0,
-          total_duration: (payload.total_duration as number) || 0,
-          language: (payload.language as string) || '',
-          source_type: (payload.source_type as string) || '',
-          folder: (payload.folder as string) || '未分类',
-          folder_id: (payload.folder_id as string) || null,
-          thumbnail_url: (payload.thumbnail_url as string) || null,
-        };
-      });
+      return await this.videoListCache.getOrLoad(
+        VIDEO_LIST_CACHE_KEY,
+        () => this.scrollAllVideos(),
+        forceRefresh
+      );
     } catch (error) {
+      rethrowIfUnavailable(error);
       console.error('Failed to list videos:', error);
       return [];
     }
   }
 
   /**
-   * 获取视频的分句数和时长统计（从 chunks collection）
+   * 按文件夹获取视频（folder_id -> videos 索引在每份缓存列表上只构建一次）
+   * folderId 为 null 表示未分类
    */
-  async getVideoStats(videoId: string): Promise<{ segment_count: number; total_duration: number }> {
+  async listVideosInFolder(folderId: string | null, forceRefresh: boolean = false): Promise<QdrantVideo[]> {
+    const index = this.getFolderIndex(await this.listAllVideos(forceRefresh));
+    return index.get(folderId) || [];
+  }
+
+  /**
+   * 每个文件夹的视频数量，未分类计入 'uncategorized'
+   */
+  async countVideosByFolder(): Promise<Record<string, number>> {
+    const index = this.getFolderIndex(await this.listAllVideos());
+    const counts: Record<string, number> = {};
+    for (const [fid, videos] of index) {
+      counts[fid || 'uncategorized'] = videos.length;
+    }
+    return counts;
+  }
+
+  private getFolderIndex(videos: QdrantVideo[]): Map<string | null, QdrantVideo[]> {
+    let index = this.folderIndexes.get(videos);
+    if (!index) {
+      index = new Map();
+      for (const video of videos) {
+        const fid = video.folder_id || null;
+        const bucket = index.get(fid);
+        if (bucket) {
+          bucket.push(video);
+        } else {
+          index.set(fid, [video]);
+        }
+      }
+      this.folderIndexes.set(videos, index);
+    }
+    return index;
+  }
+
+  isVideoListCached(): boolean {
+    return this.videoListCache.has(VIDEO_LIST_CACHE_KEY);
+  }
+
+  invalidateVideoList(): void {
+    this.videoListCache.delete(VIDEO_LIST_CACHE_KEY);
+    this.pageCursorCache.clear();
+    this.searchCache.clear();
+  }
+
+  /**
+   * 在 Qdrant 端完成文件夹过滤和分页，只传输当前页的数据
+   * 页游标未知（直接跳页）时返回 null，调用方应回退到完整列表
+   */
+  async listVideosPage(
+    folderId: string | undefined,
+    page: number,
+    pageSize: number
+  ): Promise<{ videos: QdrantVideo[]; total: number } | null> {
+    const cursorKey = (p: number) => `${folderId || ''}:${pageSize}:${p}`;
+
+    let offset: string | number | undefined;
+    if (page > 1) {
+      offset = this.pageCursorCache.get(cursorKey(page));
+      if (offset === undefined) return null;
+    }
+
     try {
-      const results = await this.client.scroll(this.collectionChunks, {
-        filter: {
-          must: [{ key: 'video_id', match: { value: videoId } }],
-        },
-        limit: 1000,
-        with_payload: true,
+      const filter = this.buildVideoFilter(folderId);
+      const [results, countResult] = await Promise.all([
+        this.client.scroll(this.collectionMetadata, {
+          filter,
+          limit: pageSize,
+          offset,
+          with_payload: { include: VIDEO_PAYLOAD_FIELDS },
+          with_vector: false,
+        }),
+        this.client.count(this.collectionMetadata, { filter, exact: true }),
+      ]);
+
+      const nextOffset = results.next_page_offset;
+      if (nextOffset !== undefined && nextOffset !== null) {
+        this.pageCursorCache.set(cursorKey(page + 1), nextOffset as string | number);
+      }
+
+      return {
+        videos: results.points.map(point => this.toVideo(point)),
+        total: countResult.count,
+      };
+    } catch (error) {
+      rethrowIfUnavailable(error);
+      console.error('Failed to list videos page:', error);
+      return null;
+    }
+  }
+
+  private buildVideoFilter(folderId?: string) {
+    return {
+      must: folderId ? [{ key: 'folder_id', match: { value: folderId } }] : [],
+      must_not: [{ key: 'type', match: { value: 'folder_registry' } }],
+    };
+  }
+
+  /**
+   * 翻页拉取全部视频，过滤条件与 listVideosPage 相同，缓存列表与分页总数覆盖同一批视频
+   */
+  private async scrollAllVideos(): Promise<QdrantVideo[]> {
+    const videos: QdrantVideo[] = [];
+    for await (const points of this.scrollPages(
+      this.collectionMetadata,
+      this.buildVideoFilter(),
+      { include: VIDEO_PAYLOAD_FIELDS }
+    )) {
+      for (const point of points) {
+        videos.push(this.toVideo(point));
+      }
+    }
+    return videos;
+  }
+
+  /**
+   * 按页 scroll（next_page_offset 翻页），每次产出一页 points，避免一次性拉取全部数据
+   */
+  private async *scrollPages(
+    collection: string,
+    filter: Record<string, unknown>,
+    withPayload: PayloadSelector = true,
+    pageSize: number = SCROLL_PAGE_SIZE
+  ): AsyncGenerator<Array<{ id: string | number; payload?: Record<string, unknown> | null }>> {
+    let offset: string | number | undefined;
+    do {
+      const page = await this.client.scroll(collection, {
+        filter,
+        limit: pageSize,
+        offset,
+        with_payload: withPayload,
         with_vector: false,
       });
+      yield page.points;
 
-      const segments = results.points;
+      const next = page.next_page_offset;
+      offset = next === undefined || next === null ? undefined : next as string | number;
+    } while (offset !== undefined);
+  }
+
+  private toVideo(point: { id: string | number; payload?: Record<string, unknown> | null }): QdrantVideo {
+    const payload = point.payload || {};
+    return {
+      video_id: (payload.video_id as string) || String(point.id),
+      video_path: (payload.video_path as string) || null,
+      video_title: (payload.video_title as string) || null,
+      topic: (payload.video_title as string) || null,
+      video_summary: (payload.video_summary as string) || null,
+      total_segments: (payload.total_segments as number) || 0,
+      total_duration: (payload.total_duration as number) || 0,
+      language: (payload.language as string) || '',
+      source_type: (payload.source_type as string) || '',
+      folder: (payload.folder as string) || '未分类',
+      folder_id: (payload.folder_id as string) || null,
+      thumbnail_url: (payload.thumbnail_url as string) || null,
+    };
+  }
+
+  /**
+   * 获取视频的分句数和时长统计（从 chunks collection）
+   */
+  async getVideoStats(videoId: string): Promise<{ segment_count: number; total_duration: number }> {
+    try {
+      let segmentCount = 0;
       let maxEndTime = 0;
 
-      for (const point of segments) {
-        const endTime = (point.payload?.end_time as number) || 0;
-        if (endTime > maxEndTime) {
-          maxEndTime = endTime;
+      for await (const points of this.scrollPages(
+        this.collectionChunks,
+        this.videoFilter(videoId),
+        { include: ['end_time'] }
+      )) {
+        segmentCount += points.length;
+        for (const point of points) {
+          const endTime = (point.payload?.end_time as number) || 0;
+          if (endTime > maxEndTime) {
+            maxEndTime = endTime;
+          }
         }
       }
 
       return {
-        segment_count: segments.length,
+        segment_count: segmentCount,
         total_duration: maxEndTime * 1000, // 转换为毫秒
       };
     } catch (error) {
+      rethrowIfUnavailable(error);
       console.error('Failed to get video stats:', error);
       return { segment_count: 0, total_duration: 0 };
     }
@@ -185,6 +638,7 @@ export class VideoQdrantClient {
 
       return videosWithStats;
     } catch (error) {
+      rethrowIfUnavailable(error);
       console.error('Failed to get videos with stats:', error);
       return [];
     }
@@ -209,15 +663,40 @@ export class VideoQdrantClient {
     };
   } | null> {
     try {
-      // Get metadata
-      const metadataResults = await this.client.scroll(this.collectionMetadata, {
-        filter: {
-          must: [{ key: 'video_id', match: { value: videoId } }],
-        },
-        limit: 1,
-        with_payload: true,
-        with_vector: false,
-      });
+      // metadata 和 chunks 两个 scroll 互不依赖，并发请求
+      const filter = this.videoFilter(videoId);
+
+      // Get chunks - 按页 scroll，先收集 [start, end, text, summary]，排序一次后一趟构建结果
+      const collectRows = async () => {
+        const rows: Array<[number, number, string, string | undefined]> = [];
+        for await (const points of this.scrollPages(
+          this.collectionChunks,
+          filter,
+          { include: ['start_time', 'end_time', 'chunk_text', 'paragraph_summary'] }
+        )) {
+          for (const point of points) {
+            const payload = point.payload || {};
+            rows.push([
+              (payload.start_time as number) || 0,
+              (payload.end_time as number) || 0,
+              (payload.chunk_text as string) || '',
+              (payload.paragraph_summary as string) || undefined,
+            ]);
+          }
+        }
+        return rows;
+      };
+
+      const [metadataResults, rows] = await Promise.all([
+        // Get metadata
+        this.client.scroll(this.collectionMetadata, {
+          filter,
+          limit: 1,
+          with_payload: { include: ['video_summary', 'video_path', 'video_title'] },
+          with_vector: false,
+        }),
+        collectRows(),
+      ]);
 
       let videoSummary = '';
       let videoPath: string | null = null;
@@ -230,48 +709,33 @@ export class VideoQdrantClient {
         videoTitle = (payload.video_title as string) || null;
       }
 
-      // Get chunks
-      const chunksResults = await this.client.scroll(this.collectionChunks, {
-        filter: {
-          must: [{ key: 'video_id', match: { value: videoId } }],
-        },
-        limit: 1000,
-        with_payload: true,
-        with_vector: false,
-      });
-
-      if (chunksResults.points.length === 0) {
+      if (rows.length === 0) {
         return null;
       }
 
-      // Build segments (convert seconds to milliseconds)
-      const segments = chunksResults.points.map((point, idx) => {
-        const payload = point.payload || {};
-        const startSec = (payload.start_time as number) || 0;
-        const endSec = (payload.end_time as number) || 0;
-
-        return {
-          index: idx,
-          spk_id: null,
-          sentence: (payload.chunk_text as string) || '',
-          start_time: startSec * 1000,
-          end_time: endSec * 1000,
-        };
-      });
-
       // Sort by start_time
-      segments.sort((a, b) => a.start_time - b.start_time);
-      segments.forEach((seg, idx) => { seg.index = idx; });
-
-      // Build paragraph summaries
-      const summaries = chunksResults.points
-        .filter(p => p.payload?.paragraph_summary)
-        .map(p => ({
-          start_time: ((p.payload?.start_time as number) || 0) * 1000,
-          end_time: ((p.payload?.end_time as number) || 0) * 1000,
-          text: (p.payload?.chunk_text as string) || '',
-          summary: (p.payload?.paragraph_summary as string) || '',
-        }));
+      rows.sort((a, b) => a[0] - b[0]);
+
+      // Build segments and paragraph summaries (convert seconds to milliseconds)
+      const segments = new Array<{
+        index: number;
+        spk_id: null;
+        sentence: string;
+        start_time: number;
+        end_time: number;
+      }>(rows.length);
+      const summaries: Array<{ start_time: number; end_time: number; text: string; summary: string }> = [];
+
+      for (let i = 0; i < rows.length; i++) {
+        const [startSec, endSec, text, summary] = rows[i];
+        const startMs = startSec * 1000;
+        const endMs = endSec * 1000;
+
+        segments[i] = { index: i, spk_id: null, sentence: text, start_time: startMs, end_time: endMs };
+        if (summary) {
+          summaries.push({ start_time: startMs, end_time: endMs, text, summary });
+        }
+      }
 
       // Build video summary text
       let videoSummaryText = videoSummary;
@@ -293,10 +757,11 @@ export class VideoQdrantClient {
           topic: videoTitle || '',
           summary: `共 ${segments.length} 个片段`,
           paragraph_count: summaries.length,
-          total_duration: segments.length > 0 ? segments[segments.length - 1].end_time : 0,
+          total_duration: rows[rows.length - 1][1] * 1000,
         },
       };
     } catch (error) {
+      rethrowIfUnavailable(error);
       console.error('Failed to get video paragraphs:', error);
       return null;
     }
@@ -306,6 +771,8 @@ export class VideoQdrantClient {
     try {
       const results = await this.client.retrieve(this.collectionMetadata, {
         ids: [videoId],
+        with_payload: { include: ['video_summary'] },
+        with_vector: false,
       });
 
       if (results.length > 0) {
@@ -313,44 +780,19 @@ export class VideoQdrantClient {
       }
       return null;
     } catch (error) {
+      rethrowIfUnavailable(error);
       console.error('Failed to get video summary:', error);
       return null;
     }
   }
 
-  async listFolders(): Promise<Array<{
-    folder_id: string;
-    name: string;
-    video_count: number;
-    parent_id: string | null;
-  }>> {
+  async listFolders(): Promise<Folder[]> {
     try {
-      const FOLDER_REGISTRY_ID = '00000000-0000-0000-0000-000000000001';
-      const results = await this.client.retrieve(this.collectionMetadata, {
-        ids: [FOLDER_REGISTRY_ID],
-        with_payload: true,
-        with_vector: false,
-      });
-
-      if (results.length === 0) {
-        return [];
-      }
-
-      const payload = results[0].payload || {};
-      if (payload.type !== 'folder_registry') {
-        return [];
-      }
-
-      const registryData = JSON.parse((payload.registry_data as string) || '{}');
-      const folders = registryData.folders || [];
+      // 返回副本，调用方会修改后写回 registry
+      const folders: Folder[] = (await this.readFolderRegistry()).map(folder => ({ ...folder }));
 
       // 动态计算每个文件夹的视频数量
-      const videos = await this.listAllVideos();
-      const counts: Record<string, number> = {};
-      for (const video of videos) {
-        const fid = video.folder_id || 'uncategorized';
-        counts[fid] = (counts[fid] || 0) + 1;
-      }
+      const counts = await this.countVideosByFolder();
 
       // 更新每个文件夹的视频数量，确保 parent_id 字段存在
       for (const folder of folders) {
@@ -362,17 +804,55 @@ export class VideoQdrantClient {
 
       return folders;
     } catch (error) {
+      rethrowIfUnavailable(error);
       console.error('Failed to list folders:', error);
       return [];
     }
   }
 
+  /**
+   * 读取文件夹 registry（带 TTL 缓存，写入 registry 时失效）
+   */
+  private readFolderRegistry(): Promise<Folder[]> {
+    return this.folderRegistryCache.getOrLoad(FOLDER_REGISTRY_ID, async () => {
+      const results = await this.client.retrieve(this.collectionMetadata, {
+        ids: [FOLDER_REGISTRY_ID],
+        with_payload: true,
+        with_vector: false,
+      });
+
+      const payload = results[0]?.payload || {};
+      if (payload.type !== 'folder_registry') {
+        return [];
+      }
+
+      const registryData = JSON.parse((payload.registry_data as string) || '{}');
+      return registryData.folders || [];
+    });
+  }
+
+  private async writeFolderRegistry(folders: Folder[]): Promise<void> {
+    try {
+      await this.client.upsert(this.collectionMetadata, {
+        wait: true,
+        points: [{
+          id: FOLDER_REGISTRY_ID,
+          vector: new Array(1024).fill(0), // placeholder vector
+          payload: {
+            type: 'folder_registry',
+            registry_data: JSON.stringify({ folders }),
+          },
+        }],
+      });
+    } finally {
+      this.folderRegistryCache.delete(FOLDER_REGISTRY_ID);
+    }
+  }
+
   // ==================== 文件夹管理方法 ====================
 
   async createFolder(name: string, parentId: string | null = null): Promise<string | null> {
     try {
-      const FOLDER_REGISTRY_ID = '00000000-0000-0000-0000-000000000001';
-
       // Get existing folders
       const folders = await this.listFolders();
 
@@ -400,20 +880,11 @@ export class VideoQdrantClient {
       });
 
       // Update folder registry
-      await this.client.upsert(this.collectionMetadata, {
-        wait: true,
-        points: [{
-          id: FOLDER_REGISTRY_ID,
-          vector: new Array(1024).fill(0), // placeholder vector
-          payload: {
-            type: 'folder_registry',
-            registry_data: JSON.stringify({ folders }),
-          },
-        }],
-      });
+      await this.writeFolderRegistry(folders);
 
       return folderId;
     } catch (error) {
+      rethrowIfUnavailable(error);
       console.error('Failed to create folder:', error);
       return null;
     }
@@ -421,8 +892,6 @@ export class VideoQdrantClient {
 
   async updateFolderParent(folderId: string, newParentId: string | null): Promise<boolean> {
     try {
-      const FOLDER_REGISTRY_ID = '00000000-0000-0000-0000-000000000001';
-
       // Get existing folders
       const folders = await this.listFolders();
 
@@ -450,20 +919,11 @@ export class VideoQdrantClient {
       folders[folderIndex].parent_id = newParentId;
 
       // Update folder registry
-      await this.client.upsert(this.collectionMetadata, {
-        wait: true,
-        points: [{
-          id: FOLDER_REGISTRY_ID,
-          vector: new Array(1024).fill(0),
-          payload: {
-            type: 'folder_registry',
-            registry_data: JSON.stringify({ folders }),
-          },
-        }],
-      });
+      await this.writeFolderRegistry(folders);
 
       return true;
     } catch (error) {
+      rethrowIfUnavailable(error);
       console.error('Failed to update folder parent:', error);
       return false;
     }
@@ -471,8 +931,6 @@ export class VideoQdrantClient {
 
   async renameFolder(folderId: string, newName: string): Promise<boolean> {
     try {
-      const FOLDER_REGISTRY_ID = '00000000-0000-0000-0000-000000000001';
-
       // Get existing folders
       const folders = await this.listFolders();
 
@@ -493,20 +951,11 @@ export class VideoQdrantClient {
       folders[folderIndex].name = newName;
 
       // Update folder registry
-      await this.client.upsert(this.collectionMetadata, {
-        wait: true,
-        points: [{
-          id: FOLDER_REGISTRY_ID,
-          vector: new Array(1024).fill(0),
-          payload: {
-            type: 'folder_registry',
-            registry_data: JSON.stringify({ folders }),
-          },
-        }],
-      });
+      await this.writeFolderRegistry(folders);
 
       return true;
     } catch (error) {
+      rethrowIfUnavailable(error);
       console.error('Failed to rename folder:', error);
       return false;
     }
@@ -514,8 +963,6 @@ export class VideoQdrantClient {
 
   async deleteFolder(folderId: string): Promise<boolean> {
     try {
-      const FOLDER_REGISTRY_ID = '00000000-0000-0000-0000-000000000001';
-
       // Get existing folders
       const folders = await this.listFolders();
 
@@ -530,29 +977,20 @@ export class VideoQdrantClient {
       folders.splice(folderIndex, 1);
 
       // Move videos in this folder to "未分类"
-      // Update video metadata to remove folder_id
-      const videos = await this.listAllVideos();
-      for (const video of videos) {
-        if (video.folder_id === folderId) {
-          await this.assignVideoToFolder(video.video_id, null);
-        }
-      }
-
-      // Update folder registry
-      await this.client.upsert(this.collectionMetadata, {
+      // 一次按 folder_id 过滤批量 setPayload，不再逐个视频 scroll + setPayload + 重写文件夹注册表
+      await this.client.setPayload(this.collectionMetadata, {
         wait: true,
-        points: [{
-          id: FOLDER_REGISTRY_ID,
-          vector: new Array(1024).fill(0),
-          payload: {
-            type: 'folder_registry',
-            registry_data: JSON.stringify({ folders }),
-          },
-        }],
+        filter: { must: [{ key: 'folder_id', match: { value: folderId } }] },
+        payload: { folder_id: null, folder: '未分类' },
       });
+      this.invalidateVideoList();
+
+      // Update folder registry（其余文件夹的视频数不变）
+      await this.writeFolderRegistry(folders);
 
       return true;
     } catch (error) {
+      rethrowIfUnavailable(error);
       console.error('Failed to delete folder:', error);
       return false;
     }
@@ -560,14 +998,12 @@ export class VideoQdrantClient {
 
   async assignVideoToFolder(videoId: string, folderId: string | null): Promise<boolean> {
     try {
-      // Find the video in metadata collection
+      // Find the video in metadata collection (只需要 point id)
       const results = await this.client.scroll(this.collectionMetadata, {
-        filter: {
-          must: [{ key: 'video_id', match: { value: videoId } }],
-        },
+        filter: this.videoFilter(videoId),
         limit: 1,
-        with_payload: true,
-        with_vector: true,
+        with_payload: false,
+        with_vector: false,
       });
 
       if (results.points.length === 0) {
@@ -576,30 +1012,24 @@ export class VideoQdrantClient {
       }
 
       const point = results.points[0];
-      const payload = point.payload || {};
-
-      // Update folder assignment
-      const newPayload = {
-        ...payload,
-        folder_id: folderId,
-        folder: folderId ? (await this.getFolderName(folderId)) : '未分类',
-      };
 
-      // Update the point
-      await this.client.upsert(this.collectionMetadata, {
+      // Update folder assignment - setPayload 只合并这两个字段，向量不用往返传输
+      await this.client.setPayload(this.collectionMetadata, {
         wait: true,
-        points: [{
-          id: point.id,
-          vector: point.vector as number[],
-          payload: newPayload,
-        }],
+        points: [point.id],
+        payload: {
+          folder_id: folderId,
+          folder: folderId ? (await this.getFolderName(folderId)) : '未分类',
+        },
       });
+      this.invalidateVideoList();
 
       // Update folder video counts
       await this.updateFolderCounts();
 
       return true;
     } catch (error) {
+      rethrowIfUnavailable(error);
       console.error('Failed to assign video to folder:', error);
       return false;
     }
@@ -613,16 +1043,10 @@ export class VideoQdrantClient {
 
   async updateFolderCounts(): Promise<void> {
     try {
-      const FOLDER_REGISTRY_ID = '00000000-0000-0000-0000-000000000001';
       const folders = await this.listFolders();
-      const videos = await this.listAllVideos();
 
       // Count videos per folder
-      const counts: Record<string, number> = {};
-      for (const video of videos) {
-        const fid = video.folder_id || 'uncategorized';
-        counts[fid] = (counts[fid] || 0) + 1;
-      }
+      const counts = await this.countVideosByFolder();
 
       // Update folder counts
       for (const folder of folders) {
@@ -630,18 +1054,9 @@ export class VideoQdrantClient {
       }
 
       // Update folder registry
-      await this.client.upsert(this.collectionMetadata, {
-        wait: true,
-        points: [{
-          id: FOLDER_REGISTRY_ID,
-          vector: new Array(1024).fill(0),
-          payload: {
-            type: 'folder_registry',
-            registry_data: JSON.stringify({ folders }),
-          },
-        }],
-      });
+      await this.writeFolderRegistry(folders);
     } catch (error) {
+      rethrowIfUnavailable(error);
       console.error('Failed to update folder counts:', error);
     }
   }
@@ -655,9 +1070,7 @@ export class VideoQdrantClient {
     try {
       // 1. 查找并删除 metadata collection 中的记录
       const metadataResults = await this.client.scroll(this.collectionMetadata, {
-        filter: {
-          must: [{ key: 'video_id', match: { value: videoId } }],
-        },
+        filter: this.videoFilter(videoId),
         limit: 10,
         with_payload: false,
         with_vector: false,
@@ -674,32 +1087,29 @@ export class VideoQdrantClient {
         console.log(`Deleted ${metadataIds.length} metadata points for video ${videoId}`);
       }
 
-      // 2. 查找并删除 chunks collection 中的所有相关记录
-      const chunksResults = await this.client.scroll(this.collectionChunks, {
-        filter: {
-          must: [{ key: 'video_id', match: { value: videoId } }],
-        },
-        limit: 10000,
-        with_payload: false,
-        with_vector: false,
+      // 2. 按过滤条件删除 chunks collection 中的所有相关记录
+      // 先 count 再按 filter 删除，不把所有 point id 拉到本地（原先 scroll 最多只取 10000 条）
+      const chunkFilter = this.videoFilter(videoId);
+      const { count: deletedChunks } = await this.client.count(this.collectionChunks, {
+        filter: chunkFilter,
+        exact: true,
       });
 
-      let deletedChunks = 0;
-      if (chunksResults.points.length > 0) {
-        const chunkIds = chunksResults.points.map(p => p.id);
+      if (deletedChunks > 0) {
         await this.client.delete(this.collectionChunks, {
           wait: true,
-          points: chunkIds,
+          filter: chunkFilter,
         });
-        deletedChunks = chunkIds.length;
         console.log(`Deleted ${deletedChunks} chunk points for video ${videoId}`);
       }
 
       // 3. 更新文件夹计数
+      this.invalidateVideoList();
       await this.updateFolderCounts();
 
       return { deleted_chunks: deletedChunks, deleted_metadata: deletedMetadata };
     } catch (error) {
+      rethrowIfUnavailable(error);
       console.error('Failed to delete video from Qdrant:', error);
       throw error;
     }
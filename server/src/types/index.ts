@@ -106,12 +106,19 @@ export interface AppConfig {
   postgresUrl: string;
   qdrantUrl: string;
   qdrantApiKey?: string;
+  qdrantQuantization: 'none' | 'binary' | 'scalar';
+  qdrantEnsureIndexes: boolean;
   openaiApiKey: string;
   openaiBaseUrl: string;
   openaiModel: string;
+  mindmapConcurrency: number;
+  ragEnabled: boolean;
+  ragIncludeSummaries: boolean;
+  ragMaxContextTokens: number;
   embeddingApiUrl: string;
   embeddingApiKey: string;
   embeddingModel: string;
+  embeddingEncodingFormat: 'float' | 'base64';
   ossEnabled: boolean;
   ossAccessKeyId?: string;
   ossAccessKeySecret?: string;
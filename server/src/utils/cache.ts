@@ -0,0 +1,278 @@
+/**
+ * 简单的 LRU 缓存（基于 Map 的插入顺序）
+ */
+export class LruCache<K, V> {
+  private map = new Map<K, V>();
+  private maxSize: number;
+
+  constructor(maxSize: number) {
+    this.maxSize = maxSize;
+  }
+
+  get(key: K): V | undefined {
+    const value = this.map.get(key);
+    if (value === undefined) return undefined;
+
+    // 移到末尾，标记为最近使用
+    this.map.delete(key);
+    this.map.set(key, value);
+    return value;
+  }
+
+  set(key: K, value: V): void {
+    if (this.map.has(key)) {
+      this.map.delete(key);
+    }
+    this.map.set(key, value);
+
+    // 淘汰最久未使用的条目
+    if (this.map.size > this.maxSize) {
+      const oldest = this.map.keys().next().value as K;
+      this.map.delete(oldest);
+    }
+  }
+
+  delete(key: K): boolean {
+    return this.map.delete(key);
+  }
+
+  clear(): void {
+    this.map.clear();
+  }
+
+  get size(): number {
+    return this.map.size;
+  }
+}
+
+/**
+ * 带 TTL 的缓存，同一个 key 并发加载时只发起一次请求（single-flight）
+ * 加载失败不会写入缓存
+ */
+export class TtlCache<K, V> {
+  private entries = new Map<K, { value: V; expiresAt: number }>();
+  private inflight = new Map<K, Promise<V>>();
+  private generation = 0;  // 失效时递增，丢弃失效前发起的加载结果
+  private ttlMs: number;
+
+  constructor(ttlMs: number) {
+    this.ttlMs = ttlMs;
+  }
+
+  get(key: K): V | undefined {
+    const entry = this.entries.get(key);
+    if (!entry) return undefined;
+    if (entry.expiresAt <= Date.now()) {
+      this.entries.delete(key);
+      return undefined;
+    }
+    return entry.value;
+  }
+
+  has(key: K): boolean {
+    return this.get(key) !== undefined;
+  }
+
+  set(key: K, value: V): void {
+    this.entries.set(key, { value, expiresAt: Date.now() + this.ttlMs });
+  }
+
+  /**
+   * 命中缓存直接返回，否则调用 loader；并发调用者共享同一个进行中的 Promise
+   */
+  async getOrLoad(key: K, loader: () => Promise<V>, forceRefresh: boolean = false): Promise<V> {
+    if (!forceRefresh) {
+      const cached = this.get(key);
+      if (cached !== undefined) return cached;
+    }
+
+    const pending = this.inflight.get(key);
+    if (pending) return pending;
+
+    const generation = this.generation;
+    const promise = loader()
+      .then(value => {
+        if (generation === this.generation) {
+          this.set(key, value);
+        }
+        return value;
+      })
+      .finally(() => {
+        if (this.inflight.get(key) === promise) {
+          this.inflight.delete(key);
+        }
+      });
+
+    this.inflight.set(key, promise);
+    return promise;
+  }
+
+  delete(key: K): void {
+    this.generation++;
+    this.entries.delete(key);
+    this.inflight.delete(key);
+  }
+
+  clear(): void {
+    this.generation++;
+    this.entries.clear();
+    this.inflight.clear();
+  }
+}
+
+/**
+ * 语义缓存：按向量相似度命中（余弦相似度 >= minSimilarity 视为同一查询）
+ * 条目按 bucket 分组（如 limit/阈值/过滤条件），只在同一 bucket 内比较；整体按 LRU 淘汰，带 TTL
+ * 每个 bucket 的向量量化为 int8（v * 127）连续存放在一块 Int8Array 中，逐行扫描计算点积
+ * get/set 接收已归一化的向量（normalizeVector），同一查询只需归一化一次
+ */
+export class SemanticCache<V> {
+  private entries = new Map<number, { bucket: string; value: V; expiresAt: number }>();
+  private buckets = new Map<string, VectorBucket>();
+  private nextId = 0;
+  private maxSize: number;
+  private ttlMs: number;
+  private minSimilarity: number;
+
+  constructor(maxSize: number, ttlMs: number, minSimilarity: number) {
+    this.maxSize = maxSize;
+    this.ttlMs = ttlMs;
+    this.minSimilarity = minSimilarity;
+  }
+
+  get(bucket: string, query: Float32Array): V | undefined {
+    const rows = this.buckets.get(bucket);
+    if (!rows || rows.dim !== query.length) return undefined;
+
+    const { dim, matrix } = rows;
+    const now = Date.now();
+    let bestId = -1;
+    let bestSimilarity = -Infinity;
+
+    // 倒序扫描，过期条目被交换删除时不影响尚未扫描的行
+    for (let row = rows.ids.length - 1; row >= 0; row--) {
+      const id = rows.ids[row];
+      if (this.entries.get(id)!.expiresAt <= now) {
+        this.remove(id);
+        continue;
+      }
+
+      const similarity = dotProduct(query, matrix, row * dim, dim);
+      if (similarity > bestSimilarity) {
+        bestSimilarity = similarity;
+        bestId = id;
+      }
+    }
+
+    if (bestSimilarity < this.minSimilarity) return undefined;
+
+    // 移到末尾，标记为最近使用
+    const entry = this.entries.get(bestId)!;
+    this.entries.delete(bestId);
+    this.entries.set(bestId, entry);
+    return entry.value;
+  }
+
+  set(bucket: string, vector: Float32Array, value: V): void {
+    let rows = this.buckets.get(bucket);
+    if (rows && rows.dim !== vector.length) {
+      // 维度变化（换了 embedding 模型），丢弃旧的 bucket
+      for (const id of [...rows.ids]) this.remove(id);
+      rows = undefined;
+    }
+    if (!rows) {
+      rows = { dim: vector.length, matrix: new Int8Array(vector.length * 8), ids: [] };
+      this.buckets.set(bucket, rows);
+    }
+
+    const row = rows.ids.length;
+    if ((row + 1) * rows.dim > rows.matrix.length) {
+      const grown = new Int8Array(rows.matrix.length * 2);
+      grown.set(rows.matrix);
+      rows.matrix = grown;
+    }
+    // 单位向量各分量在 [-1, 1]，量化到 [-127, 127]
+    const offset = row * rows.dim;
+    for (let i = 0; i < rows.dim; i++) {
+      rows.matrix[offset + i] = Math.round(vector[i] * 127);
+    }
+
+    const id = this.nextId++;
+    rows.ids.push(id);
+    this.entries.set(id, { bucket, value, expiresAt: Date.now() + this.ttlMs });
+
+    // 淘汰最久未使用的条目
+    if (this.entries.size > this.maxSize) {
+      this.remove(this.entries.keys().next().value as number);
+    }
+  }
+
+  clear(): void {
+    this.entries.clear();
+    this.buckets.clear();
+  }
+
+  /**
+   * 删除条目：把 bucket 最后一行移到被删除的位置，保持矩阵连续
+   */
+  private remove(id: number): void {
+    const entry = this.entries.get(id);
+    if (!entry) return;
+    this.entries.delete(id);
+
+    const rows = this.buckets.get(entry.bucket)!;
+    const row = rows.ids.indexOf(id);
+    const last = rows.ids.length - 1;
+    if (row !== last) {
+      rows.matrix.copyWithin(row * rows.dim, last * rows.dim, (last + 1) * rows.dim);
+      rows.ids[row] = rows.ids[last];
+    }
+    rows.ids.pop();
+
+    if (rows.ids.length === 0) {
+      this.buckets.delete(entry.bucket);
+    }
+  }
+}
+
+interface VectorBucket {
+  dim: number;
+  matrix: Int8Array;  // ids.length 行 × dim 列，归一化后量化为 int8
+  ids: number[];
+}
+
+/**
+ * query 与 matrix 中从 offset 开始的 int8 行做点积并还原比例（4 路展开，减少循环开销）
+ */
+function dotProduct(query: Float32Array, matrix: Int8Array, offset: number, dim: number): number {
+  let s0 = 0;
+  let s1 = 0;
+  let s2 = 0;
+  let s3 = 0;
+  let i = 0;
+  for (; i + 3 < dim; i += 4) {
+    s0 += query[i] * matrix[offset + i];
+    s1 += query[i + 1] * matrix[offset + i + 1];
+    s2 += query[i + 2] * matrix[offset + i + 2];
+    s3 += query[i + 3] * matrix[offset + i + 3];
+  }
+  for (; i < dim; i++) {
+    s0 += query[i] * matrix[offset + i];
+  }
+  return (s0 + s1 + s2 + s3) / 127;
+}
+
+/**
+ * 归一化为单位向量，之后点积即余弦相似度
+ */
+export function normalizeVector(vector: number[]): Float32Array {
+  let norm = 0;
+  for (const v of vector) norm += v * v;
+  norm = Math.sqrt(norm) || 1;
+
+  const unit = new Float32Array(vector.length);
+  for (let i = 0; i < vector.length; i++) {
+    unit[i] = vector[i] / norm;
+  }
+  return unit;
+}
@@ -1,22 +1,45 @@
 import 'dotenv/config';
 import type { AppConfig } from '../types/index.js';
 
+/**
+ * QDRANT_QUANTIZATION=binary|scalar|none，其他值按 none 处理
+ */
+function parseQuantization(): AppConfig['qdrantQuantization'] {
+  const mode = process.env.QDRANT_QUANTIZATION;
+  return mode === 'binary' || mode === 'scalar' ? mode : 'none';
+}
+
+/**
+ * 解析正整数环境变量，未设置、非数字或小于 1 时使用默认值
+ */
+function parsePositiveInt(value: string | undefined, fallback: number): number {
+  const parsed = parseInt(value || '', 10);
+  return Number.isNaN(parsed) || parsed < 1 ? fallback : parsed;
+}
+
 export function getConfig(): AppConfig {
   return {
     port: parseInt(process.env.PORT || '9999', 10),
     postgresUrl: process.env.DATABASE_URL ||
-      `postgresql://${process.env.POSTGRES_USER || 'postgres'}:${process.env.POSTGRES_PASSWORD || 'postgres'}@${process.env.POSTGRES_HOST || 'localhost'}:${process.env.POSTGRES_PORT || '5432'}/${process.env.POSTGRES_DB || 'hearsight'}`,
+      `postgresql://${encodeURIComponent(process.env.POSTGRES_USER || 'postgres')}:${encodeURIComponent(process.env.POSTGRES_PASSWORD || 'postgres')}@${process.env.POSTGRES_HOST || 'localhost'}:${process.env.POSTGRES_PORT || '5432'}/${process.env.POSTGRES_DB || 'hearsight'}`,
 
     qdrantUrl: process.env.QDRANT_URL || 'http://localhost:6333',
     qdrantApiKey: process.env.QDRANT_API_KEY,
+    qdrantQuantization: parseQuantization(),
+    qdrantEnsureIndexes: process.env.QDRANT_ENSURE_INDEXES === 'true',
 
     openaiApiKey: process.env.OPENAI_API_KEY || '',
     openaiBaseUrl: process.env.OPENAI_BASE_URL || 'https://api.openai.com/v1',
     openaiModel: process.env.OPENAI_CHAT_MODEL || 'gpt-4o-mini',
+    mindmapConcurrency: parsePositiveInt(process.env.MINDMAP_CONCURRENCY, 4),
+    ragEnabled: process.env.RAG_ENABLED !== 'false',
+    ragIncludeSummaries: process.env.RAG_INCLUDE_SUMMARIES !== 'false',
+    ragMaxContextTokens: parsePositiveInt(process.env.RAG_MAX_CONTEXT_TOKENS, 4000),
 
     embeddingApiUrl: process.env.QDRANT_EMBEDDING_API_URL || 'https://api.siliconflow.cn/v1',
     embeddingApiKey: process.env.QDRANT_EMBEDDING_API_KEY || '',
     embeddingModel: process.env.QDRANT_EMBEDDING_MODEL || 'BAAI/bge-large-zh-v1.5',
+    embeddingEncodingFormat: process.env.QDRANT_EMBEDDING_ENCODING_FORMAT === 'float' ? 'float' : 'base64',
 
     ossEnabled: process.env.OSS_ENABLED === 'true',
     ossAccessKeyId: process.env.OSS_ACCESS_KEY_ID,